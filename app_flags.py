@@ -0,0 +1,24 @@
+# app_flags.py
+from PyQt6.QtCore import QObject, pyqtProperty
+
+
+class AppFlags(QObject):
+    """Startup flags exposed to QML as the OpenMotion.AppFlags singleton (read-only)."""
+
+    def __init__(self, advanced_sensors=True, realtime_plot_enabled=False, app_version="", parent=None):
+        super().__init__(parent)
+        self._advanced_sensors = bool(advanced_sensors)
+        self._realtime_plot_enabled = bool(realtime_plot_enabled)
+        self._app_version = str(app_version)
+
+    @pyqtProperty(bool, constant=True)
+    def advancedSensors(self):
+        return self._advanced_sensors
+
+    @pyqtProperty(bool, constant=True)
+    def realtimePlotEnabled(self):
+        return self._realtime_plot_enabled
+
+    @pyqtProperty(str, constant=True)
+    def appVersion(self):
+        return self._app_version
@@ -1,25 +1,24 @@
 import sys
 import os
 import asyncio
-import argparse
-import json
+import atexit
 import warnings
 import logging
-import datetime
+import logging.handlers
+import queue
+import threading
+import multiprocessing
+import functools
+import time
 from pathlib import Path
+from typing import Optional
 
-from PyQt6.QtGui import QIcon
-from PyQt6.QtWidgets import QApplication, QMessageBox
-from PyQt6.QtQml import QQmlApplicationEngine, qmlRegisterSingletonInstance
-from PyQt6.QtCore import qInstallMessageHandler, QtMsgType
-from qasync import QEventLoop
-
-from motion_connector import MOTIONConnector
-from pathlib import Path
 from utils.single_instance import check_single_instance, cleanup_single_instance
 from version import get_version
 from utils.resource_path import resource_path
 
+import msgspec
+
 
 APP_VERSION = get_version()
 
@@ -31,110 +30,274 @@ logger.setLevel(logging.INFO)  # or INFO depending on what you want to see
 warnings.simplefilter("ignore", DeprecationWarning)
 
 # Wire up the things that get logged out of QT app to the proper logs
+_QML_LOGGER = logging.getLogger("openmotion.bloodflow-app.qml-console")
+_QML_LOGGER.setLevel(logging.INFO)
+
+# Logging level per QtMsgType value: QtDebugMsg=0, QtWarningMsg=1, QtCriticalMsg=2,
+# QtFatalMsg=3, QtInfoMsg=4. QML console.log() arrives as QtDebugMsg, so it is kept at INFO.
+_QT_LOG_LEVELS = (logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL, logging.INFO)
+
 def qt_message_handler(msg_type, context, message):
     """Custom Qt message handler to forward QML console.log() messages to the run log."""
-    # Map Qt message types to logging levels
-    log_level_map = {
-        QtMsgType.QtDebugMsg: logging.DEBUG,
-        QtMsgType.QtInfoMsg: logging.INFO,
-        QtMsgType.QtWarningMsg: logging.WARNING,
-        QtMsgType.QtCriticalMsg: logging.ERROR,
-        QtMsgType.QtFatalMsg: logging.CRITICAL,
-    }
-    
-    # Get the logging level (default to INFO for console.log)
-    log_level = log_level_map.get(msg_type, logging.INFO)
-    
-    qml_message = f"QML: {message}"
-    
-    logger = logging.getLogger("openmotion.bloodflow-app.qml-console")
-    logger.setLevel(logging.INFO)  # or INFO depending on what you want to see
-    logger.info(qml_message)
-
-def _load_app_config() -> dict:
-    """Load application config from config/app_config.json. Returns defaults if missing or invalid."""
-    defaults = {
-        "realtimePlotEnabled": False,
-        "advancedSensors": True,
-        "forceLaserFail": False,
-        "cameraTempAlertThresholdC": 105,
-        "sensorDebugLogging": False,
-        "cameraFakeData": False,
-        "output_path": None,  # None = use cwd; str = base directory for scan_data, app-logs, run-logs
-        "histoThrottle": False,
-        "powerOffUnusedCameras": False,
-        "eol_min_mean_per_camera": [0] * 8,
-        "eol_min_contrast_per_camera": [0] * 8,
-    }
+    idx = msg_type.value
+    log_level = _QT_LOG_LEVELS[idx] if 0 <= idx < len(_QT_LOG_LEVELS) else logging.INFO
+    _QML_LOGGER.log(log_level, "QML: %s", message)
+
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders the asctime date/time part once per second instead of once per record."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cached_time = (None, "")
+
+    def formatTime(self, record, datefmt=None):
+        sec = int(record.created)
+        cached_sec, cached_str = self._cached_time
+        if sec != cached_sec:
+            cached_str = time.strftime(datefmt or self.default_time_format, self.converter(record.created))
+            self._cached_time = (sec, cached_str)
+        if datefmt:
+            return cached_str
+        return self.default_msec_format % (cached_str, record.msecs)
+
+class _BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler that writes through a 64 KiB buffer instead of flushing every record.
+    Data reaches the disk when the buffer fills, on flush()/close(), or for ERROR and above.
+    """
+
+    _closed_for_good = False  # set by close(); a "w" file must not be reopened (and truncated)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=65536,
+                    encoding=self.encoding, errors=self.errors)
+
+    def close(self):
+        self._closed_for_good = True
+        super().close()
+
+    def emit(self, record):
+        if self.stream is None:
+            if self.mode != "w" or not self._closed_for_good:
+                self.stream = self._open()
+        if self.stream is None:
+            return
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.ERROR:
+                self.stream.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+class _TimedMemoryHandler(logging.handlers.MemoryHandler):
+    """
+    MemoryHandler that is also flushed (through to the target's stream) every
+    flush_interval seconds by a daemon timer thread, so buffered records reach the
+    disk even when logging goes quiet. The GUI thread never does the write.
+    """
+
+    def __init__(self, *args, flush_interval: float = 1.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flush_interval = flush_interval
+        self._stop_timer = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically, name="log-flush", daemon=True)
+        self._timer.start()
+
+    def _flush_periodically(self):
+        while not self._stop_timer.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        super().flush()
+        self.acquire()
+        try:
+            if self.target:
+                self.target.flush()
+        finally:
+            self.release()
+
+    def close(self):
+        self._stop_timer.set()
+        super().close()
+
+class AppConfig(msgspec.Struct):
+    """Settings from config/app_config.json. Keys missing from the file keep these defaults; unknown keys are ignored."""
+    realtimePlotEnabled: bool = False
+    advancedSensors: bool = True
+    forceLaserFail: bool = False
+    cameraTempAlertThresholdC: float = 105
+    sensorDebugLogging: bool = False
+    cameraFakeData: bool = False
+    output_path: Optional[str] = None  # None = use cwd; str = base directory for scan_data, app-logs, run-logs
+    histoThrottle: bool = False
+    powerOffUnusedCameras: bool = False
+    # null disables the check (see MOTIONConnector.set_eol_thresholds)
+    eol_min_mean_per_camera: Optional[list[float]] = msgspec.field(default_factory=lambda: [0] * 8)
+    eol_min_contrast_per_camera: Optional[list[float]] = msgspec.field(default_factory=lambda: [0] * 8)
+
+def _app_config_from_valid_keys(loaded) -> AppConfig:
+    """Build an AppConfig from the keys in loaded that validate on their own; the rest keep defaults."""
+    if not isinstance(loaded, dict):
+        return AppConfig()
+    valid = {}
+    for name in AppConfig.__struct_fields__:
+        if name not in loaded:
+            continue
+        try:
+            msgspec.convert({name: loaded[name]}, AppConfig)
+        except msgspec.ValidationError as e:
+            logger.warning("Ignoring invalid app config value for %s: %s", name, e)
+            continue
+        valid[name] = loaded[name]
+    return msgspec.convert(valid, AppConfig)
+
+@functools.cache
+def _load_app_config() -> AppConfig:
+    """
+    Load application config from config/app_config.json. Returns defaults if missing or invalid.
+    The result is cached; use msgspec.structs.replace() to derive a modified copy.
+    """
     config_path = resource_path("config", "app_config.json")
     if not config_path.exists():
         logger.info("No app_config.json found at %s, using defaults", config_path)
-        return defaults
+        return AppConfig()
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            loaded = json.load(f)
-        out = {**defaults, **{k: v for k, v in loaded.items() if k in defaults or k == "output_path"}}
+        raw = config_path.read_bytes()
+        try:
+            out = msgspec.json.decode(raw, type=AppConfig)
+        except msgspec.ValidationError:
+            # One bad value shouldn't cost the other settings (e.g. output_path)
+            out = _app_config_from_valid_keys(msgspec.json.decode(raw))
         logger.info("Loaded app config from %s: realtimePlotEnabled=%s, advancedSensors=%s",
-                    config_path, out.get("realtimePlotEnabled"), out.get("advancedSensors"))
+                    config_path, out.realtimePlotEnabled, out.advancedSensors)
         return out
-    except (json.JSONDecodeError, OSError) as e:
+    except (msgspec.DecodeError, OSError) as e:
         logger.warning("Could not load app config from %s: %s; using defaults", config_path, e)
-        return defaults
+        return AppConfig()
+
+
+# Tasks main() puts on the loop; shutdown() cancels these rather than scanning all_tasks()
+_owned_tasks = set()
+
+
+def _own(task):
+    _owned_tasks.add(task)
+    task.add_done_callback(_owned_tasks.discard)
+    return task
+
+
+def _spawn(coro):
+    return _own(asyncio.ensure_future(coro))
+
+
+def _show_already_running():
+    """Tell the user another instance is running, without loading Qt where possible."""
+    title = "OpenWater Bloodflow"
+    text = "Another instance of the application is already running."
+    info = "Please close the existing instance before opening a new one."
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            MB_OK_ICONWARNING = 0x00000030
+            ctypes.windll.user32.MessageBoxW(None, f"{text}\n\n{info}", title, MB_OK_ICONWARNING)
+            return
+        except Exception:
+            pass  # Fall back to Qt below
+
+    from PyQt6.QtWidgets import QApplication, QMessageBox
+
+    # Create a minimal QApplication to show message box
+    app = QApplication(sys.argv)
+    msg_box = QMessageBox()
+    msg_box.setIcon(QMessageBox.Icon.Warning)
+    msg_box.setWindowTitle(title)
+    msg_box.setText(text)
+    msg_box.setInformativeText(info)
+    msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
+    msg_box.exec()
 
 
 def main():
+    os.environ.update({
+        "QT_QUICK_CONTROLS_STYLE": "Material",
+        "QT_QUICK_CONTROLS_MATERIAL_THEME": "Dark",
+        "QT_LOGGING_RULES": "qt.qpa.fonts=false",
+    })
+
     # Check if another instance is already running
     if not check_single_instance():
-        # Create a minimal QApplication to show message box
-        app = QApplication(sys.argv)
-        msg_box = QMessageBox()
-        msg_box.setIcon(QMessageBox.Icon.Warning)
-        msg_box.setWindowTitle("OpenWater Bloodflow")
-        msg_box.setText("Another instance of the application is already running.")
-        msg_box.setInformativeText("Please close the existing instance before opening a new one.")
-        msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
-        msg_box.exec()
+        _show_already_running()
         sys.exit(1)
-    
-    os.environ["QT_QUICK_CONTROLS_STYLE"] = "Material"
-    os.environ["QT_QUICK_CONTROLS_MATERIAL_THEME"] = "Dark"
-    os.environ["QT_LOGGING_RULES"] = "qt.qpa.fonts=false"
 
+    # Heavy imports are deferred until we know this instance will actually run
+    from PyQt6.QtGui import QIcon
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtQml import QQmlApplicationEngine, QQmlComponent, qmlRegisterSingletonInstance
+    from PyQt6.QtCore import qInstallMessageHandler, QUrl
+    from qasync import QEventLoop
+    
     # --- parse flags ignore unknown (Qt) flags ---
+    import argparse
     parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument("--advanced-sensors", action="store_true")
+    parser.add_argument("--dump-loggers", action="store_true")
     my_args, _unknown = parser.parse_known_args(sys.argv[1:])
 
     # Configure logging
-    formatter = logging.Formatter(
+    formatter = _CachedTimeFormatter(
         '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
     )
     #Configure console logging
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+
+    # Callers only enqueue records; the listener thread does the formatting and disk I/O.
+    # Records logged before the listener starts wait in the queue.
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Attach once at the common "openmotion" ancestor: app and SDK records propagate
+    # up to it, so each record is enqueued and written exactly once
+    openmotion_logger = logging.getLogger("openmotion")
+    openmotion_logger.addHandler(queue_handler)
+    openmotion_logger.propagate = False  # Don't propagate to root, use our handlers
 
     #Configure file logging
     app_config = _load_app_config()
-    output_base = app_config.get("output_path") or os.getcwd()
-    run_dir = os.path.join(output_base, "app-logs")
-    os.makedirs(run_dir, exist_ok=True)
-    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S") # Build timestamp like 20251029_124455
-    logfile_path = os.path.join(run_dir, f"ow-bloodflowapp-{ts}.log")
+    output_base = app_config.output_path or os.getcwd()
+    run_dir = Path(output_base) / "app-logs"
+    run_dir.mkdir(parents=True, exist_ok=True)
+    # Timestamp like 20251029_124455
+    import datetime
+    logfile_path = run_dir / f"ow-bloodflowapp-{datetime.datetime.now():%Y%m%d_%H%M%S}.log"
 
-    file_handler = logging.FileHandler(logfile_path, mode='w', encoding='utf-8')
+    file_handler = _BufferedFileHandler(logfile_path, mode='w', encoding='utf-8', delay=True)
     file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    logger.info(f"logging to {logfile_path}")
+
+    # Batch file writes, pushed to disk at most ~1 s apart; ERROR and above go straight out
+    file_buffer = _TimedMemoryHandler(
+        capacity=1024, flushLevel=logging.ERROR, target=file_handler, flushOnClose=True,
+        flush_interval=1.0,
+    )
+
+    log_listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_buffer, respect_handler_level=True
+    )
+    log_listener.start()
+
+    def _drain_logs():
+        log_listener.stop()
+        file_buffer.flush()
+
+    atexit.register(_drain_logs)  # Drain queued records on every exit path
+    logger.info("logging to %s", logfile_path)
     
-    # Configure the SDK logger hierarchy to use the same handlers
+    # The SDK logger hierarchy reaches the same handlers through "openmotion"
     sdk_logger = logging.getLogger("openmotion.sdk")
     sdk_logger.setLevel(logging.INFO)
-    sdk_logger.addHandler(console_handler)
-    sdk_logger.addHandler(file_handler)
-    sdk_logger.propagate = False  # Don't propagate to root, use our handlers
 
     qInstallMessageHandler(qt_message_handler)
     
@@ -158,65 +321,122 @@ def main():
     
     engine = QQmlApplicationEngine()
 
+    loop = QEventLoop(app)
+    asyncio.set_event_loop(loop)
+
+    # Put a window on screen before importing the device stack and compiling main.qml
+    engine.load(str(resource_path("splash.qml")))
+    splash = engine.rootObjects()[0] if engine.rootObjects() else None
+
     # Apply CLI overrides to already-loaded app_config
     if my_args.advanced_sensors:
-        app_config["advancedSensors"] = True
-
-    connector = MOTIONConnector(
-        advanced_sensors=app_config.get("advancedSensors", True),
-        force_laser_fail=app_config.get("forceLaserFail", False),
-        camera_temp_alert_threshold_c=app_config.get("cameraTempAlertThresholdC", 105),
-        sensor_debug_logging=app_config.get("sensorDebugLogging", False),
-        camera_fake_data=app_config.get("cameraFakeData", False),
-        histo_throttle=app_config.get("histoThrottle", False),
-        power_off_unused_cameras=app_config.get("powerOffUnusedCameras", False),
-        output_path=output_base,
-    )
-    connector.set_eol_thresholds(
-        app_config.get("eol_min_mean_per_camera"),
-        app_config.get("eol_min_contrast_per_camera"),
-    )
-    qmlRegisterSingletonInstance("OpenMotion", 1, 0, "MOTIONInterface", connector)
-    engine.rootContext().setContextProperty("AppFlags", {
-        "advancedSensors": app_config.get("advancedSensors", True),
-        "realtimePlotEnabled": app_config.get("realtimePlotEnabled", False),
-    })
-    engine.rootContext().setContextProperty("appVersion", APP_VERSION)
+        app_config = msgspec.structs.replace(app_config, advancedSensors=True)
 
-    # Load the QML file
-    engine.load(str(resource_path("main.qml")))
+    connector = None
 
-    if not engine.rootObjects():
-        logger.error("Error: Failed to load QML file")
-        sys.exit(-1)
+    def _preload_pages():
+        # Compile the Loader-driven pages on the first loop tick so the first switch to
+        # each tab doesn't stall; the engine keeps the compiled types after the
+        # components go away. Pages are not instantiated: their onCompleted handlers
+        # call into MOTIONInterface (e.g. DataAnalysis scans the data directory).
+        for page in ("pages/DataAnalysis.qml", "pages/Settings.qml"):
+            component = QQmlComponent(engine, QUrl.fromLocalFile(str(resource_path(page))))
+            if component.isError():
+                logger.warning("Could not preload %s: %s", page, component.errorString())
+            component.deleteLater()
 
-    loop = QEventLoop(app)
-    asyncio.set_event_loop(loop)
+    async def finish_init():
+        nonlocal connector
 
-    async def main_async():
+        if splash is not None:
+            # Let the splash paint once; frameSwapped may come from the render thread
+            first_frame = loop.create_future()
+            splash.frameSwapped.connect(
+                lambda: loop.call_soon_threadsafe(lambda: first_frame.done() or first_frame.set_result(None))
+            )
+            try:
+                await asyncio.wait_for(first_frame, timeout=0.5)
+            except asyncio.TimeoutError:
+                pass
+
+        # motion_connector acquires the MOTION interface at import time
+        from motion_connector import MOTIONConnector
+        from app_flags import AppFlags
+
+        connector = MOTIONConnector(
+            advanced_sensors=app_config.advancedSensors,
+            force_laser_fail=app_config.forceLaserFail,
+            camera_temp_alert_threshold_c=app_config.cameraTempAlertThresholdC,
+            sensor_debug_logging=app_config.sensorDebugLogging,
+            camera_fake_data=app_config.cameraFakeData,
+            histo_throttle=app_config.histoThrottle,
+            power_off_unused_cameras=app_config.powerOffUnusedCameras,
+            output_path=output_base,
+        )
+        connector.set_eol_thresholds(
+            app_config.eol_min_mean_per_camera,
+            app_config.eol_min_contrast_per_camera,
+        )
+        qmlRegisterSingletonInstance("OpenMotion", 1, 0, "MOTIONInterface", connector)
+        app_flags = AppFlags(
+            advanced_sensors=app_config.advancedSensors,
+            realtime_plot_enabled=app_config.realtimePlotEnabled,
+            app_version=APP_VERSION,
+        )
+        qmlRegisterSingletonInstance("OpenMotion", 1, 0, "AppFlags", app_flags)
+
+        # Probe for devices on a worker thread while the QML below is compiled
+        bootstrap_future = connector.start_bootstrap(loop)
+
+        # Load the QML file
+        root_count = len(engine.rootObjects())
+        engine.load(str(resource_path("main.qml")))
+
+        if len(engine.rootObjects()) == root_count:
+            logger.error("Error: Failed to load QML file")
+            return False
+
+        if splash is not None:
+            splash.close()
+            splash.deleteLater()
+
+        loop.call_soon(_preload_pages)
+
+        await bootstrap_future
         logger.info("Starting MOTION monitoring...")
+        # start_monitoring() starts its polling tasks on this loop; adopt them so
+        # shutdown() cancels them (with its time bound) before the loop closes
+        tasks_before = asyncio.all_tasks()
         await connector._interface.start_monitoring()
+        for task in asyncio.all_tasks() - tasks_before:
+            _own(task)
+        return True
 
     async def shutdown():
         logger.info("Shutting down MOTION monitoring...")
-        connector._interface.stop_monitoring()
+        if connector is not None:
+            connector._interface.stop_monitoring()
 
-        pending_tasks = [t for t in asyncio.all_tasks() if not t.done()]
+        pending_tasks = {t for t in _owned_tasks if t.cancel()}
         if pending_tasks:
-            logger.info(f"Cancelling {len(pending_tasks)} pending tasks...")
-            for task in pending_tasks:
-                task.cancel()
-            await asyncio.gather(*pending_tasks, return_exceptions=True)
+            logger.info("Cancelling %d pending tasks...", len(pending_tasks))
+            # Don't let a task that swallows cancellation hold up the exit
+            _, stuck = await asyncio.wait(pending_tasks, timeout=2.0)
+            if stuck:
+                logger.warning("%d tasks did not finish cancelling: %s", len(stuck), stuck)
 
         logger.info("LIFU monitoring stopped. Application shutting down.")
 
     def handle_exit():
         logger.info("Application closing...")
+        if my_args.dump_loggers:
+            logger.info("Logger tree: %s", sorted(logging.root.manager.loggerDict))
         # Cease scan, stop console trigger, turn off camera modules before monitoring stops
-        try:
-            connector.shutdown()
-        except Exception as e:
-            logger.warning("Error during connector shutdown: %s", e)
+        if connector is not None:
+            try:
+                connector.shutdown()
+            except Exception as e:
+                logger.warning("Error during connector shutdown: %s", e)
         asyncio.ensure_future(shutdown()).add_done_callback(lambda _: loop.stop())
         engine.deleteLater()  # Ensure QML engine is destroyed
         cleanup_single_instance()  # Clean up single-instance lock
@@ -225,20 +445,20 @@ def main():
 
     try:
         with loop:
-            loop.run_until_complete(main_async())
+            if not loop.run_until_complete(_spawn(finish_init())):
+                sys.exit(-1)
             loop.run_forever()
     except RuntimeError as e:
         if "Event loop stopped before Future completed" in str(e):
             logger.warning("App closed while a Future was still running (safe to ignore)")
         else:
-            logger.error(f"Runtime error: {e}")
+            logger.error("Runtime error: %s", e)
     except KeyboardInterrupt:
         logger.info("Application interrupted by user.")
     finally:
-        #print out logger tree
-        logger.info("Logger tree:")
-        logger.info(logger.manager.loggerDict)
         loop.close()
 
 if __name__ == "__main__":
+    # Post-processing uses a process pool; frozen (PyInstaller) children must stop here
+    multiprocessing.freeze_support()
     main()
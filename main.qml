@@ -35,7 +35,7 @@ ApplicationWindow {
             // Set title and logo dynamically
             titleText: "Open-MOTION BloodFlow"
             logoSource: "../assets/images/OpenwaterLogo.png" // Correct relative path
-            appVerText: "" + appVersion
+            appVerText: AppFlags.appVersion
             sdkVerText: "" + MOTIONInterface.get_sdk_version()
         }
 
@@ -1,26 +1,31 @@
-from PyQt6.QtCore import QObject, pyqtSignal, pyqtProperty, pyqtSlot, QVariant, QThread, QWaitCondition, QMutex, QTimer
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtProperty, pyqtSlot, QVariant, QThread, QThreadPool, QUrl, QWaitCondition, QMutex, QTimer
 from typing import List
 from pathlib import Path
 import logging
 import base58
 import threading
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 import queue
 import json
 import csv
 import os
 import datetime
 import time
-import random
 import math
 import re
 import string
+import secrets
 import platform
 import socket
 
 from motion_singleton import motion_interface  
 
 from omotion.config import DEBUG_FLAG_USB_PRINTF, DEBUG_FLAG_FAKE_DATA, DEBUG_FLAG_HISTO_THROTTLE
-from processing.data_processing import DataProcessor, HISTO_BINS
+from processing.data_processing import (
+    DataProcessor, HISTO_BINS, histo_packet_size, init_cancel_event, process_bin_file_cancellable,
+)
 from processing.visualize_bloodflow import VisualizeBloodflow
 from utils.resource_path import resource_path
 import struct
@@ -39,14 +44,47 @@ R234 = 300E3
 R_s = 0.020 #(R217)
 TEC_VOLTAGE_DEFAULT = -0.07  # volts (DVT1a=-0.07, EVT2=1.16)
 DATA_ACQ_INTERVAL = 1.0
+CAPTURE_WRITE_BUFFER = 1 << 20  # bytes, per-side capture CSV
+
+# Permits each background job takes from the connector's worker budget (cpu_count - 1).
+# Capture (stream reader + CSV writer) is real-time: it takes what is free without
+# waiting, so post-processing and visualization queue behind a running scan.
+WORKER_BUDGETS = {"capture": 2, "post": 2, "viz": 1}
 
 HISTO_BINS_SQ = HISTO_BINS * HISTO_BINS
+
+# Everything str.isalnum() rejects (\w is alnum plus "_"); used to normalize subject IDs
+_SUBJECT_ID_STRIP = re.compile(r"[\W_]+")
+# "scan_<id>_left_mask0F.csv" (or the .raw it was converted from) -> "0F"
+_SCAN_MASK_RE = re.compile(r"_mask([0-9A-Fa-f]+)\.(?:csv|raw)$")
+# Characters dropped from subject IDs in run-log filenames
+_RUNLOG_NAME_STRIP = re.compile(r"[^A-Za-z0-9_-]")
+# "..._left_mask0F.csv" / "..._right_mask0F.csv" -> "..._bfi_results.csv"
+_BFI_RESULTS_LEFT_RE = re.compile(r"_left.*\.csv$")
+_BFI_RESULTS_RIGHT_RE = re.compile(r"_right.*\.csv$")
 _BFI_CAL = VisualizeBloodflow(left_csv="", right_csv="")
 _BFI_C_MIN = _BFI_CAL.C_min
 _BFI_C_MAX = _BFI_CAL.C_max
 _BFI_I_MIN = _BFI_CAL.I_min
 _BFI_I_MAX = _BFI_CAL.I_max
 
+def _pack_i2c_writes(params) -> list:
+    """
+    Turn laser_params entries into (muxIdx, channel, i2cAddr, offset, data) tuples, once.
+
+    One tuple per config entry, in file order: entries are never merged, since the
+    console firmware is only known to handle the writes exactly as the file splits them.
+    """
+    return [
+        (param["muxIdx"], param["channel"], param["i2cAddr"], param["offset"], bytearray(param["dataToSend"]))
+        for param in params
+    ]
+
+_SUBJECT_ID_ALPHABET = string.ascii_uppercase + string.digits
+
+# DataProcessor keeps no state, so capture and post-processing share one instance
+_DATA_PROCESSOR = DataProcessor()
+
 # Global loggers - will be configured by _configure_logging method
 logger = logging.getLogger("openmotion.bloodflow-app.connector")
 run_logger = logging.getLogger("bloodflow-app.runlog")
@@ -129,30 +167,41 @@ class MOTIONConnector(QObject):
         # Initialize CSV output directory to user's home directory
         self._csv_output_directory = os.path.expanduser("~")
 
-        # Check if console and sensor are connected
-        console_connected, left_sensor_connected, right_sensor_connected = motion_interface.is_device_connected()
-
-        self._leftSensorConnected = left_sensor_connected
-        self._rightSensorConnected = right_sensor_connected
-        self._consoleConnected = console_connected
+        # Connection flags are filled in by start_bootstrap() once the device probe returns
+        self._leftSensorConnected = False
+        self._rightSensorConnected = False
+        self._consoleConnected = False
+        self._notified_connection_flags = self._connection_flags()  # as last reported to QML
+        self._connection_refresh_pending = False
         self._config_thread = None
         self._laserOn = False
         self._safetyFailure = False
         self._running = False
         self._trigger_state = "OFF"
+        self._trigger_json_cache = ("", {})  # (raw JSON, parsed) from the last trigger query
         self._state = DISCONNECTED
         self.laser_params = self._load_laser_params(config_dir)
+        self._laser_writes = _pack_i2c_writes(self.laser_params)
         self._tec_voltage_default = self._load_tec_params(config_dir)
 
         self._eol_min_mean_per_camera = None  # list of 8 or None; set via set_eol_thresholds()
         self._eol_min_contrast_per_camera = None
 
-        self._post_thread = None
+        self._hw_cache = {}  # "console"/"left"/"right" -> (fw_version, device_id); dropped on disconnect
+
+        self._post_running = False
         self._post_cancel = threading.Event()
 
+        # Reused threads for short background jobs; leave a core for the GUI and USB I/O
+        self._worker_budget = max(1, (os.cpu_count() or 2) - 1)
+        self._worker_pool = QThreadPool(self)
+        self._worker_pool.setMaxThreadCount(self._worker_budget)
+        self._worker_slots = threading.BoundedSemaphore(self._worker_budget)
+
         self._capture_thread = None
         self._capture_stop = threading.Event()
-        self._capture_running = False
+        self._capture_running = False  # the one capture-lifecycle flag; claimed/released under _capture_lock
+        self._capture_lock = threading.Lock()
         self._safety_cancel_scheduled = False  # True after scheduling cancel-due-to-safety; cleared when capture ends
         self._capture_left_path = ""
         self._capture_right_path = ""
@@ -160,6 +209,7 @@ class MOTIONConnector(QObject):
         self.connect_signals()
         self._viz_thread = None
         self._viz_worker = None
+        self._viz_pool = None  # ProcessPoolExecutor for bloodflow compute; created on first use
         self._console_status_thread = None
 
         self._corr_queue = queue.Queue()
@@ -195,26 +245,15 @@ class MOTIONConnector(QObject):
         default_dir = os.path.join(self._output_base, "scan_data")
         os.makedirs(default_dir, exist_ok=True)
         self._directory = default_dir
+        # (directory, mtime_ns) -> scan index; rebuilt only when the directory changes
+        self._scan_cache_key = None
+        self._scan_cache = {}
+        self._scan_ids = []
         logger.info(f"[Connector] Default directory initialized to: {self._directory}")
 
         self._subject_id = self.generate_subject_id()
         logger.info(f"[Connector] Generated subject ID: {self._subject_id}")
 
-        # Emit synthetic connect events for devices already connected at startup
-        if self._leftSensorConnected:
-            self.on_connected("SENSOR_LEFT", "startup")
-        if self._rightSensorConnected:
-            self.on_connected("SENSOR_RIGHT", "startup")
-        if self._consoleConnected:
-            self.on_connected("CONSOLE", "startup")
-
-        # Start console status thread if console is already connected at startup
-        if self._consoleConnected and self._console_status_thread is None:
-            logger.info("[Connector] Console already connected at startup, starting status thread")
-            self._console_status_thread = ConsoleStatusThread(self)
-            self._console_status_thread.statusUpdate.connect(self.handleUpdateCapStatus)
-            self._console_status_thread.start()
-
     def set_eol_thresholds(
         self,
         min_mean_per_camera=None,
@@ -340,9 +379,9 @@ class MOTIONConnector(QObject):
         os.makedirs(run_dir, exist_ok=True)
 
         # Timestamped filename for this specific trigger session
-        ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        ts = time.strftime("%Y%m%d_%H%M%S")
         base_subject = subject_id or self._subject_id or "unknown"
-        safe_subject = re.sub(r"[^A-Za-z0-9_-]", "", base_subject)
+        safe_subject = _RUNLOG_NAME_STRIP.sub("", base_subject)
         self._runlog_path = os.path.join(run_dir, f"run-{safe_subject}_{ts}.log")
         self._runlog_csv_path = os.path.join(run_dir, f"run-{safe_subject}_{ts}.csv")
 
@@ -539,6 +578,16 @@ class MOTIONConnector(QObject):
         except Exception as e:
             run_logger.warning(f"Failed to log system information: {e}")
 
+    def _cached_device_info(self, key: str, module):
+        """Return (fw_version, base58 device_id) for a device, querying it only once per connection."""
+        info = self._hw_cache.get(key)
+        if info is None:
+            fw_version = module.get_version()
+            hw_id = module.get_hardware_id()
+            info = (fw_version, base58.b58encode(bytes.fromhex(hw_id)).decode())
+            self._hw_cache[key] = info
+        return info
+
     def log_device_information(self):
         """Log information about connected sensors and console to the run log."""
         try:
@@ -549,9 +598,7 @@ class MOTIONConnector(QObject):
             # Console information
             if self._consoleConnected:
                 try:
-                    fw_version = motion_interface.console_module.get_version()
-                    hw_id = motion_interface.console_module.get_hardware_id()
-                    device_id = base58.b58encode(bytes.fromhex(hw_id)).decode()
+                    fw_version, device_id = self._cached_device_info("console", motion_interface.console_module)
                     run_logger.info(f"Console - Firmware: {fw_version}, Device ID: {device_id}")
                 except Exception as e:
                     run_logger.warning(f"Console - Failed to get device info: {e}")
@@ -563,9 +610,7 @@ class MOTIONConnector(QObject):
                 try:
                     sensor = motion_interface.sensors.get("left")
                     if sensor is not None:
-                        fw_version = sensor.get_version()
-                        hw_id = sensor.get_hardware_id()
-                        device_id = base58.b58encode(bytes.fromhex(hw_id)).decode()
+                        fw_version, device_id = self._cached_device_info("left", sensor)
                         run_logger.info(f"Left Sensor - Firmware: {fw_version}, Device ID: {device_id}")
                     else:
                         run_logger.warning("Left Sensor - Sensor object is None")
@@ -579,9 +624,7 @@ class MOTIONConnector(QObject):
                 try:
                     sensor = motion_interface.sensors.get("right")
                     if sensor is not None:
-                        fw_version = sensor.get_version()
-                        hw_id = sensor.get_hardware_id()
-                        device_id = base58.b58encode(bytes.fromhex(hw_id)).decode()
+                        fw_version, device_id = self._cached_device_info("right", sensor)
                         run_logger.info(f"Right Sensor - Firmware: {fw_version}, Device ID: {device_id}")
                     else:
                         run_logger.warning("Right Sensor - Sensor object is None")
@@ -616,14 +659,15 @@ class MOTIONConnector(QObject):
         return self._subject_id
 
     def setSubjectId(self, value: str):
-        if not value:
+        # QML's two-way binding writes the current value back; it is already normalized
+        if not value or value == self._subject_id:
             return
         # normalize to "ow" + alphanumerics (uppercase)
         if value.startswith("ow"):
             rest = value[2:]
         else:
             rest = value
-        rest = "".join(ch for ch in rest.upper() if ch.isalnum())
+        rest = _SUBJECT_ID_STRIP.sub("", rest.upper())
         new_val = "ow" + rest
         if new_val != self._subject_id:
             self._subject_id = new_val
@@ -707,14 +751,14 @@ class MOTIONConnector(QObject):
                     pass
 
         self.signalConnected.emit(descriptor, port)
-        self.connectionStatusChanged.emit() 
-        self.update_state()
+        self._schedule_connection_refresh()
 
     @pyqtSlot(str, str)
     def on_disconnected(self, descriptor, port):
         """Handle device disconnection."""
         if descriptor.upper() == "SENSOR_LEFT":
             self._leftSensorConnected = False
+            self._hw_cache.pop("left", None)
             try:
                 sensor = self._interface.sensors.get("left") if self._interface and self._interface.sensors else None
                 if sensor is not None and getattr(sensor, "clear_id_cache", None) is not None:
@@ -723,6 +767,7 @@ class MOTIONConnector(QObject):
                 pass
         elif descriptor.upper() == "SENSOR_RIGHT":
             self._rightSensorConnected = False
+            self._hw_cache.pop("right", None)
             try:
                 sensor = self._interface.sensors.get("right") if self._interface and self._interface.sensors else None
                 if sensor is not None and getattr(sensor, "clear_id_cache", None) is not None:
@@ -731,6 +776,7 @@ class MOTIONConnector(QObject):
                 pass
         elif descriptor.upper() == "CONSOLE":
             self._consoleConnected = False
+            self._hw_cache.pop("console", None)
             # Stop console status thread when console disconnects
             if self._console_status_thread:
                 self._console_status_thread.stop()
@@ -738,21 +784,50 @@ class MOTIONConnector(QObject):
 
         logger.info(f"Device disconnected: {descriptor} on port {port} and state is {self._state}")
         self.signalDisconnected.emit(descriptor, port)
-        self.connectionStatusChanged.emit() 
+        self._schedule_connection_refresh()
+
+    def _connection_flags(self):
+        return (self._consoleConnected, self._leftSensorConnected, self._rightSensorConnected)
+
+    def _schedule_connection_refresh(self):
+        """Fold a burst of connect/disconnect callbacks into one QML refresh on the next loop pass."""
+        if self._connection_refresh_pending:
+            return
+        self._connection_refresh_pending = True
+        QTimer.singleShot(0, self._refresh_connection_state)
+
+    def _refresh_connection_state(self):
+        self._connection_refresh_pending = False
+        flags = self._connection_flags()
+        if flags != self._notified_connection_flags:
+            self._notified_connection_flags = flags
+            self.connectionStatusChanged.emit()
         self.update_state()
+
+    def _connected_sensor(self, side: str):
+        """
+        Sensor module for side, or None if it is down. Goes by the flags that
+        on_connected/on_disconnected maintain instead of querying the device.
+        """
+        connected = self._leftSensorConnected if side == "left" else self._rightSensorConnected
+        if not connected or not (self._interface and self._interface.sensors):
+            return None
+        return self._interface.sensors.get(side)
  
     def update_state(self):
-        """Update system state based on connection and configuration."""
-        if not self._consoleConnected and ((not self._leftSensorConnected) or (not self._rightSensorConnected)):
-            self._state = DISCONNECTED
-        elif self._leftSensorConnected and not self._consoleConnected:
-            self._state = SENSOR_CONNECTED
-        elif self._consoleConnected and not self._leftSensorConnected:
-            self._state = CONSOLE_CONNECTED
-        elif self._consoleConnected and self._leftSensorConnected:
-            self._state = READY
-        elif self._consoleConnected and self._leftSensorConnected and self._running:
-            self._state = RUNNING
+        """Update system state based on connection and configuration; notifies QML only on a change."""
+        console, left, right = self._connection_flags()
+        if console and left:
+            new_state = RUNNING if self._running else READY
+        elif console:
+            new_state = CONSOLE_CONNECTED
+        elif left and right:
+            new_state = SENSOR_CONNECTED
+        else:
+            new_state = DISCONNECTED
+        if new_state == self._state:
+            return
+        self._state = new_state
         self.stateChanged.emit()  # Notify QML of state update
         logger.info(f"Updated state: {self._state}")
    
@@ -796,11 +871,12 @@ class MOTIONConnector(QObject):
         except Exception as e:
             logger.warning("Error disabling cameras: %s", e)
 
-        if self._capture_thread and self._capture_thread.is_alive():
-            self._capture_thread.join(timeout=5.0)
-            if self._capture_thread and self._capture_thread.is_alive():
+        # The worker clears _capture_thread itself when it finishes; join a local reference
+        t = self._capture_thread
+        if t and t.is_alive():
+            t.join(timeout=5.0)
+            if t.is_alive():
                 logger.warning("Capture thread did not finish within 5s timeout")
-        self._capture_thread = None
 
     @pyqtSlot()
     def shutdown(self):
@@ -822,6 +898,17 @@ class MOTIONConnector(QObject):
         except Exception as e:
             logger.warning("Error stopping monitoring: %s", e)
 
+        if self._viz_pool is not None:
+            self._viz_pool.shutdown(wait=False, cancel_futures=True)
+            self._viz_pool = None
+
+        # Destroying the pool waits for running jobs; drop queued ones, ask a running
+        # post job to cancel, and bound the wait so a long conversion can't hold up exit
+        self._worker_pool.clear()
+        self._post_cancel.set()
+        if not self._worker_pool.waitForDone(5000):
+            logger.warning("Background jobs still running at shutdown; not waiting for them.")
+
         logger.info("MOTIONConnector shutdown complete.")
 
     # --- SCAN MANAGEMENT METHODS ---
@@ -869,63 +956,88 @@ class MOTIONConnector(QObject):
             logger.error(f"[Connector] Error loading TEC parameters: {e}, using default value {TEC_VOLTAGE_DEFAULT}V")
             return TEC_VOLTAGE_DEFAULT
             
+    def _scan_index(self) -> dict:
+        """
+        Map scan_id -> {"notes"/"left"/"right": filename} for the current directory.
+        Cached on the directory's mtime, which moves whenever a scan file is added or removed;
+        writers here also reset the cache, since FAT32/SMB mtimes are too coarse to rely on.
+        """
+        directory = self._directory
+        try:
+            key = (directory, os.stat(directory).st_mtime_ns)
+        except OSError:
+            return {}
+        if key == self._scan_cache_key:
+            return self._scan_cache
+
+        index = {}
+        try:
+            with os.scandir(directory) as it:
+                for e in it:
+                    name = e.name
+                    if not name.startswith("scan_") or not e.is_file():
+                        continue
+                    # e.g., "scan_owIZGDFP_20250808_120740_notes.txt" -> "owIZGDFP_20250808_120740"
+                    if name.endswith("_notes.txt"):
+                        index.setdefault(name[5:-10], {})["notes"] = name
+                    elif name.endswith(".csv"):
+                        for side in ("left", "right"):
+                            i = name.find(f"_{side}_mask")
+                            if i > 5:
+                                index.setdefault(name[5:i], {}).setdefault(side, name)
+                                break
+        except OSError:
+            return {}
+
+        # sort by timestamp desc; assumes format owXXXXXX_YYYYMMDD_HHMMSS
+        keyed = [(sid.partition("_")[2] or sid, sid) for sid, files in index.items() if "notes" in files]
+        keyed.sort(reverse=True)
+        self._scan_ids = [sid for _, sid in keyed]
+        self._scan_cache = index
+        self._scan_cache_key = key
+        return index
+
     @pyqtSlot(result=list)
     def get_scan_list(self):
         """Return sorted list of scans like 'owABCD12_YYYYMMDD_HHMMSS'."""
-        base_path = Path(self._directory)
-        if not base_path.exists():
+        if not self._scan_index():
             return []
-
-        ids = []
-        for f in base_path.glob("scan_*_notes.txt"):
-            if not f.is_file():
-                continue
-            stem = f.stem  # e.g., "scan_owIZGDFP_20250808_120740_notes"
-            # strip leading "scan_" and trailing "_notes"
-            if stem.startswith("scan_"):
-                stem = stem[5:]
-            if stem.endswith("_notes"):
-                stem = stem[:-6]
-            ids.append(stem)
-
-        # sort by timestamp desc; assumes format owXXXXXX_YYYYMMDD_HHMMSS
-        def ts_key(s):
-            parts = s.split("_", 1)
-            return parts[1] if len(parts) == 2 else s
-        return sorted(ids, key=ts_key, reverse=True)
+        return list(self._scan_ids)
 
     @pyqtSlot(str, result=QVariant)
     def get_scan_details(self, scan_id: str):
         """
         scan_id like 'owIZGDFP_20250808_120740' (no 'scan_' prefix).
         """
-        base = Path(self._directory)
+        directory = self._directory
         try:
             subject, ts = scan_id.split("_", 1)
         except ValueError:
             return {}
 
-        notes_path = base / f"scan_{scan_id}_notes.txt"
-        left  = next(base.glob(f"scan_{scan_id}_left_mask*.csv"), None)
-        right = next(base.glob(f"scan_{scan_id}_right_mask*.csv"), None)
+        files = self._scan_index().get(scan_id, {})
+        notes_path = os.path.join(directory, f"scan_{scan_id}_notes.txt")
+        left  = files.get("left", "")
+        right = files.get("right", "")
 
         # Extract mask from each file separately
         left_mask = ""
         right_mask = ""
         
         if left:
-            m = re.search(r"_mask([0-9A-Fa-f]+)\.raw$", left.name)
+            m = _SCAN_MASK_RE.search(left)
             if m:
                 left_mask = m.group(1)
         
         if right:
-            m = re.search(r"_mask([0-9A-Fa-f]+)\.raw$", right.name)
+            m = _SCAN_MASK_RE.search(right)
             if m:
                 right_mask = m.group(1)
 
         notes = ""
         try:
-            notes = notes_path.read_text(encoding="utf-8")
+            with open(notes_path, encoding="utf-8") as nf:
+                notes = nf.read()
         except Exception:
             pass
 
@@ -934,9 +1046,9 @@ class MOTIONConnector(QObject):
             "timestamp": ts,
             "leftMask": left_mask,
             "rightMask": right_mask,
-            "leftPath": str(left) if left else "",
-            "rightPath": str(right) if right else "",
-            "notesPath": str(notes_path),
+            "leftPath": os.path.join(directory, left) if left else "",
+            "rightPath": os.path.join(directory, right) if right else "",
+            "notesPath": notes_path,
             "notes": notes,
         }
 
@@ -946,9 +1058,12 @@ class MOTIONConnector(QObject):
 
     @directory.setter
     def directory(self, path):
-        # Normalize incoming QML "file:///" path
-        if path.startswith("file:///"):
-            path = path[8:] if path[9] != ':' else path[8:]
+        # Normalize incoming QML "file:" URL (handles drive letters and UNC hosts)
+        if path.startswith("file:"):
+            path = QUrl(path).toLocalFile()
+        path = os.path.normpath(path)
+        if path == self._directory:
+            return
         self._directory = path
         logger.debug(f"[Connector] Default directory set to: {self._directory}")
         self.directoryChanged.emit()
@@ -965,7 +1080,7 @@ class MOTIONConnector(QObject):
             self.scanNotesChanged.emit()  
 
     def generate_subject_id(self):
-        suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        suffix = "".join(secrets.choice(_SUBJECT_ID_ALPHABET) for _ in range(6))
         return f"ow{suffix}"
         
     # --- CONSOLE COMMUNICATION METHODS ---
@@ -973,10 +1088,8 @@ class MOTIONConnector(QObject):
     def queryConsoleInfo(self):
         """Fetch and emit device information."""
         try:
-            fw_version = motion_interface.console_module.get_version()
+            fw_version, device_id = self._cached_device_info("console", motion_interface.console_module)
             logger.info(f"Version: {fw_version}")
-            hw_id = motion_interface.console_module.get_hardware_id()
-            device_id = base58.b58encode(bytes.fromhex(hw_id)).decode()
             self.consoleDeviceInfoReceived.emit(fw_version, device_id)
             logger.info(f"Console Device Info - Firmware: {fw_version}, Device ID: {device_id}")
         except Exception as e:
@@ -991,10 +1104,6 @@ class MOTIONConnector(QObject):
             f"dir={data_dir}, disable_laser={disable_laser})"
         )
 
-        if self._capture_running or self._capture_thread is not None:
-            self.captureLog.emit("Capture already running.")
-            return False
-
         if self._safetyFailure:
             self.captureLog.emit("Scan cannot start: laser safety system is tripped. Clear the safety interlock first.")
             return False
@@ -1009,15 +1118,15 @@ class MOTIONConnector(QObject):
         # Determine which sides we will actually capture (mask != 0 and sensor connected)
         interface = self._interface
         sides_info = [
-            ("left",  left_camera_mask,  interface.sensors.get("left")),
-            ("right", right_camera_mask, interface.sensors.get("right")),
+            ("left",  left_camera_mask,  self._connected_sensor("left")),
+            ("right", right_camera_mask, self._connected_sensor("right")),
         ]
         active_sides = []
         for side, mask, sensor in sides_info:
             if mask == 0x00:
                 logger.info(f"{side} mask is 0x00 — skipping {side} capture.")
                 continue
-            if not (sensor and sensor.is_connected()):
+            if sensor is None:
                 logger.warning(f"{side} sensor not connected — skipping {side} capture.")
                 continue
             active_sides.append((side, mask, sensor))
@@ -1026,9 +1135,17 @@ class MOTIONConnector(QObject):
             self.captureLog.emit("No active sensors to capture (both masks 0x00 or disconnected).")
             return False
 
+        # Claim the capture in one check-and-set; the worker releases it in its finally block
+        with self._capture_lock:
+            if self._capture_running:
+                self.captureLog.emit("Capture already running.")
+                return False
+            self._capture_running = True
+        self._running = True
+        self.update_state()
+
         logger.info("Capture worker thread starting…")
         self._capture_stop = threading.Event()
-        self._capture_running = True
         self._capture_left_path = ""
         self._capture_right_path = ""
 
@@ -1043,12 +1160,17 @@ class MOTIONConnector(QObject):
             err = ""
             left_path = ""
             right_path = ""
+            # side -> (writer thread, its queue); the writer exits on a None in its queue
+            writers: dict[str, tuple[threading.Thread, queue.SimpleQueue]] = {}
+            slots = self._acquire_worker_slots("capture", blocking=False)
 
             try:
                 # Start the per-run log now before any other logging
                 self._start_runlog(subject_id=subject_id)
                 
-                ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+                ts = time.strftime("%Y%m%d_%H%M%S")
+                # Shared by the per-side data files and the notes file
+                scan_prefix = f"scan_{subject_id}_{ts}"
                 logger.info("Preparing capture…")
                 self.captureLog.emit("Preparing capture…")
 
@@ -1075,31 +1197,29 @@ class MOTIONConnector(QObject):
                         self.captureLog.emit(err)
                         raise RuntimeError(err)
 
-                # Setup streaming per active side
-                writer_threads: dict[str, threading.Thread] = {}
-                writer_stops: dict[str, threading.Event] = {}
-
-                # If payload size depends on enabled cameras, compute here; otherwise keep constant.
-                expected_size = 32837  # TODO: adjust if payload varies with mask
+                # Setup streaming per active side. The stream is always sized for a
+                # full 8-camera packet (32837 bytes): nothing shows the SDK/firmware
+                # shortens packets when fewer cameras are enabled.
+                expected_size = histo_packet_size(0xFF)
 
                 logger.info("Setup streaming per active side")
                 for side, mask, sensor in active_sides:
-                    q = queue.Queue()
-                    stop_evt = threading.Event()
+                    # Single producer (the histo stream) and single consumer (the writer):
+                    # SimpleQueue's C put/get is all that's needed, no task_done bookkeeping
+                    q = queue.SimpleQueue()
                     # Start device streaming into queue
                     sensor.uart.histo.start_streaming(q, expected_size=expected_size)
 
-                    filename = f"scan_{subject_id}_{ts}_{side}_mask{mask:02X}.csv"
+                    filename = f"{scan_prefix}_{side}_mask{mask:02X}.csv"
                     filepath = os.path.join(data_dir, filename)
                     t = threading.Thread(
                         target=self._write_stream_to_file,
-                        args=(q, stop_evt, filepath, side),
+                        args=(q, filepath, side),
                         daemon=True,
                     )
                     t.start()
 
-                    writer_threads[side] = t
-                    writer_stops[side] = stop_evt
+                    writers[side] = (t, q)
                     if side == "left":
                         left_path = filepath
                     elif side == "right":
@@ -1123,17 +1243,21 @@ class MOTIONConnector(QObject):
                 self.triggerStateChanged.emit()
 
                 # Progress loop
-                start_t = time.time()
-                last_emit = -1
-                while not self._capture_stop.is_set():
-                    elapsed = time.time() - start_t
-                    pct = int(min(100, max(0, (elapsed / max(1, duration_sec)) * 100)))
-                    if pct != last_emit:
-                        self.captureProgress.emit(pct if pct >= 1 else 1)
-                        last_emit = pct
+                # Sleep until the next whole percent (or a stop request) rather than polling
+                start_t = time.monotonic()
+                span = max(1, duration_sec)
+                self.captureProgress.emit(1)
+                next_pct = 2
+                while True:
+                    elapsed = time.monotonic() - start_t
                     if elapsed >= duration_sec:
                         break
-                    time.sleep(0.2)
+                    if self._capture_stop.wait(max(0.0, min(next_pct * span / 100.0, duration_sec) - elapsed)):
+                        break
+                    pct = min(100, int((time.monotonic() - start_t) / span * 100))
+                    if pct >= next_pct:
+                        self.captureProgress.emit(pct)
+                        next_pct = pct + 1
 
                 # Stop trigger (once)
                 self.captureLog.emit("Stopping trigger…")
@@ -1150,17 +1274,17 @@ class MOTIONConnector(QObject):
                         self.captureLog.emit(f"Failed to disable camera on {side} (mask 0x{mask:02X}).")
                 # Stop sensor streaming
                 self.captureLog.emit("Stop Sensors Streaming...")
-                for side, mask, sensor in active_sides:
-                    if sensor:
-                        try:
-                            sensor.uart.histo.stop_streaming()
-                        except Exception as e:
-                            self.captureLog.emit(f"stop_streaming[{side}] error: {e}")
+                # active_sides was filtered to connected sensors once, before the scan
+                for side, _, sensor in active_sides:
+                    try:
+                        sensor.uart.histo.stop_streaming()
+                    except Exception as e:
+                        self.captureLog.emit(f"stop_streaming[{side}] error: {e}")
 
-                # Stop sensor streaming & writer threads
-                for side, stop_evt in writer_stops.items():
-                    stop_evt.set()
-                for side, t in writer_threads.items():
+                # Streaming has stopped: end each writer's queue, then let it drain
+                for _, q in writers.values():
+                    q.put(None)
+                for t, _ in writers.values():
                     t.join(timeout=5.0)
 
                 ok = not self._capture_stop.is_set()
@@ -1168,10 +1292,12 @@ class MOTIONConnector(QObject):
                     self.captureLog.emit("Capture session complete.")
                     # Save notes file for the whole scan
                     try:
-                        notes_filename = f"scan_{subject_id}_{ts}_notes.txt"
+                        notes_filename = f"{scan_prefix}_notes.txt"
                         notes_path = os.path.join(data_dir, notes_filename)
                         with open(notes_path, "w", encoding="utf-8") as nf:
                             nf.write(self._scan_notes.strip() + "\n")
+                        # Coarse mtimes (FAT32, SMB) may not move for a new file
+                        self._scan_cache_key = None
                         logger.info(f"Saved scan notes to {notes_path}")
                     except Exception as e:
                         logger.error(f"Failed to save scan notes: {e}")
@@ -1188,9 +1314,14 @@ class MOTIONConnector(QObject):
                 self.captureLog.emit(f"Capture error: {err}")
                 ok = False
             finally:
-                self._capture_running = False
+                # On an error path the writers never got their end marker; a second one is harmless
+                for _, q in writers.values():
+                    q.put(None)
+                self._release_worker_slots(slots)
                 self._safety_cancel_scheduled = False
-                self._capture_thread = None
+                with self._capture_lock:
+                    self._capture_running = False
+                    self._capture_thread = None
                 self.captureFinished.emit(ok, err, left_path, right_path)
                 self._stop_runlog()
         # launch worker
@@ -1315,7 +1446,7 @@ class MOTIONConnector(QObject):
         try:
             eol_dir = os.path.join(self._output_base, "app-logs", "eol-test-csvs")
             os.makedirs(eol_dir, exist_ok=True)
-            ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            ts = time.strftime("%Y%m%d_%H%M%S")
             eol_path = os.path.join(eol_dir, f"eol-test-{ts}.csv")
             with open(eol_path, "w", newline="", encoding="utf-8") as f:
                 w = csv.DictWriter(
@@ -1330,6 +1461,12 @@ class MOTIONConnector(QObject):
             logger.warning(f"Failed to write EOL test CSV: {e}")
             run_logger.warning(f"Failed to write EOL test CSV: {e}")
 
+    @pyqtSlot(bool, str, str, str)
+    def _on_capture_finished(self, ok, err, left_path, right_path):
+        """Runs on the main thread (queued from the capture worker): leave RUNNING."""
+        self._running = False
+        self.update_state()
+
     def _on_safety_trip_during_capture(self):
         """Called on main thread when safety tripped while scan was running: show message and cancel scan in 5 s."""
         if not self._capture_running or self._safety_cancel_scheduled:
@@ -1454,17 +1591,19 @@ class MOTIONConnector(QObject):
                 "SE": 6,
                 "SO": 7
             }
-            statuses = {}
 
+            # Both channels share the console link, so reads can't overlap; a fault in the
+            # low nibble of either one trips the interlock, so stop at the first one found
+            tripped = False
             for label, channel in channels.items():
                 status = self.i2cReadBytes("CONSOLE", muxIdx, channel, i2cAddr, offset, data_len)
-                if status:
-                    statuses[label] = status[0]                
-                else:
+                if not status:
                     raise Exception("readSafetyStatus error (I2C read error)")
-                
-            status_text = f"SE: 0x{statuses['SE']:02X}, SO: 0x{statuses['SO']:02X}"
-            if (statuses["SE"] & 0x0F) == 0 and (statuses["SO"] & 0x0F) == 0:
+                if status[0] & 0x0F:
+                    tripped = True
+                    break
+
+            if not tripped:
                 if self._safetyFailure:
                     self.safetyFailure = False
             else:
@@ -1533,19 +1672,20 @@ class MOTIONConnector(QObject):
     @pyqtSlot(result=QVariant)
     def queryTriggerConfig(self):
         trigger_setting = motion_interface.console_module.get_trigger_json()
-        if trigger_setting:
-            if isinstance(trigger_setting, str):
-                updateTrigger = json.loads(trigger_setting)
-            else:
-                updateTrigger = trigger_setting
-            if updateTrigger["TriggerStatus"] == 2:               
-                self._trigger_state = "ON"
-                self.triggerStateChanged.emit()            
-                return trigger_setting or {}
-       
-        self._trigger_state = "OFF"
-        self.triggerStateChanged.emit()
-                
+        updateTrigger = trigger_setting
+        if isinstance(trigger_setting, str) and trigger_setting:
+            # Polled from QML; the JSON rarely changes, so only re-parse when it does
+            raw, parsed = self._trigger_json_cache
+            if trigger_setting != raw:
+                parsed = json.loads(trigger_setting)
+                self._trigger_json_cache = (trigger_setting, parsed)
+            updateTrigger = parsed
+
+        new_state = "ON" if updateTrigger and updateTrigger["TriggerStatus"] == 2 else "OFF"
+        if new_state != self._trigger_state:
+            self._trigger_state = new_state
+            self.triggerStateChanged.emit()
+
         return trigger_setting or {}
     
     @pyqtSlot(str, result=bool)
@@ -1623,19 +1763,15 @@ class MOTIONConnector(QObject):
          
     def set_laser_power_from_config(self, interface):
         logger.info("[Connector] Setting laser power from config...")
-        for idx, laser_param in enumerate(self.laser_params, start=1):
-            muxIdx = laser_param["muxIdx"]
-            channel = laser_param["channel"]
-            i2cAddr = laser_param["i2cAddr"]
-            offset = laser_param["offset"]
-            dataToSend = bytearray(laser_param["dataToSend"])
-
-            logger.debug(
-                f"[Connector] ({idx}/{len(self.laser_params)}) "
-                f"Writing I2C: muxIdx={muxIdx}, channel={channel}, "
-                f"i2cAddr=0x{i2cAddr:02X}, offset=0x{offset:02X}, "
-                f"data={list(dataToSend)}"
-            )
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for idx, (muxIdx, channel, i2cAddr, offset, dataToSend) in enumerate(self._laser_writes, start=1):
+            if debug:
+                logger.debug(
+                    f"[Connector] ({idx}/{len(self._laser_writes)}) "
+                    f"Writing I2C: muxIdx={muxIdx}, channel={channel}, "
+                    f"i2cAddr=0x{i2cAddr:02X}, offset=0x{offset:02X}, "
+                    f"data={list(dataToSend)}"
+                )
 
             if not interface.console_module.write_i2c_packet(
                 mux_index=muxIdx, channel=channel,
@@ -1720,39 +1856,15 @@ class MOTIONConnector(QObject):
     def startConfigureCameraSensors(self, left_camera_mask:int, right_camera_mask:int):
         if self._config_thread: return
 
-        # Power on cameras for each side before programming FPGAs (same as at scan start)
+        # Camera power is switched by the worker too: it sleeps to let the rails settle
+        power_sides = None
         if(self._power_off_unused_cameras):
-            logger.info("Powering on cameras before programming FPGAs…")
-            sides_info = [
-                ("left", left_camera_mask, self.interface.sensors.get("left")),
-                ("right",right_camera_mask, self.interface.sensors.get("right")),
+            power_sides = [
+                ("left", left_camera_mask, self._connected_sensor("left")),
+                ("right",right_camera_mask, self._connected_sensor("right")),
             ]
-            for side, mask, sensor in sides_info:
-                if mask == 0 or not (sensor and sensor.is_connected()):
-                    continue
-                try:
-                    power_status = sensor.get_camera_power_status()
-                    if not power_status or len(power_status) != 8:
-                        logger.warning(f"{side}: could not get camera power status")
-                        continue
-                    off_mask = sum(1 << i for i in range(8) if power_status[i] and not (mask & (1 << i)))
-                    on_mask = mask & 0xFF
-                    if off_mask:
-                        if sensor.disable_camera_power(off_mask):
-                            logger.warning(f"{side}: powered off cameras not in mask (0x{off_mask:02X})")
-                        time.sleep(0.05)
-                    if on_mask:
-                        if sensor.enable_camera_power(on_mask):
-                            logger.warning(f"{side}: powered on cameras (mask 0x{on_mask:02X})")
-                        else:
-                            logger.warning(f"Failed to power on cameras on {side} (mask 0x{on_mask:02X}).")
-                            return
-                        time.sleep(0.5)
-                except Exception as e:
-                    logger.error(f"Error setting camera power for {side}: {e}")
-                    return
 
-        w = _ConfigureWorker(self._interface, left_camera_mask, right_camera_mask)
+        w = _ConfigureWorker(self._interface, left_camera_mask, right_camera_mask, power_sides=power_sides)
         w.progress.connect(self.configProgress.emit)
         w.log.connect(self.configLog.emit)
         w.finished.connect(self._on_config_finished)
@@ -1878,10 +1990,8 @@ class MOTIONConnector(QObject):
                 logger.error(f"{sensor_tag.capitalize()} sensor object is None")
                 return
                 
-            fw_version = sensor.get_version()
+            fw_version, device_id = self._cached_device_info(sensor_tag, sensor)
             logger.info(f"Version: {fw_version}")
-            hw_id = sensor.get_hardware_id()
-            device_id = base58.b58encode(bytes.fromhex(hw_id)).decode()
             self.sensorDeviceInfoReceived.emit(fw_version, device_id)
             logger.info(f"Sensor Device Info - Firmware: {fw_version}, Device ID: {device_id}")
         except Exception as e:
@@ -1984,7 +2094,14 @@ class MOTIONConnector(QObject):
 
         # start worker thread (compute only)
         self._viz_thread = QThread(self)
-        self._viz_worker = _VizWorker(left_csv, right_csv, t1, t2, plot_contrast)
+        if self._viz_pool is None:
+            # compute() is NumPy/pandas heavy with plenty of Python in between; keep it off this process's GIL
+            self._viz_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            )
+        self._viz_worker = _VizWorker(left_csv, right_csv, t1, t2, plot_contrast,
+                                      worker_slots=self._worker_slots, pool=self._viz_pool,
+                                      on_pool_broken=self._drop_viz_pool)
         self._viz_worker.moveToThread(self._viz_thread)
 
         # --- connections when starting the worker ---
@@ -1997,6 +2114,12 @@ class MOTIONConnector(QObject):
         self._viz_thread.start()
         return True
 
+    def _drop_viz_pool(self, pool):
+        """Forget a viz pool whose worker died; the next run starts a new one."""
+        if self._viz_pool is pool:
+            self._viz_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
     @pyqtSlot(object)
     def _onVizResults(self, payload: dict):
         try:
@@ -2056,7 +2179,7 @@ class MOTIONConnector(QObject):
         Convert left/right .raw to .csv in-place (same directory).
         Returns False if a post job is already running.
         """
-        if self._post_thread is not None:
+        if self._post_running:
             self.postLog.emit("Post-process already running.")
             return False
 
@@ -2064,50 +2187,80 @@ class MOTIONConnector(QObject):
         right_raw = right_raw or ""
         self._post_cancel = threading.Event()
 
+        # Outputs sit next to the inputs: "<name>.raw" -> "<name>.csv"
+        sides = [
+            (label, raw, os.path.splitext(raw)[0] + ".csv")
+            for label, raw in (("LEFT", left_raw), ("RIGHT", right_raw))
+            if raw
+        ]
+
         def _worker():
             ok = True
             err = ""
             left_csv = ""
             right_csv = ""
 
+            slots = self._acquire_worker_slots("post", blocking=False)
+            if slots < min(WORKER_BUDGETS["post"], self._worker_budget):
+                # A capture (or visualization) holds the permits; say so before blocking
+                self._release_worker_slots(slots)
+                self.postLog.emit("Waiting for capture to finish…")
+                slots = self._acquire_worker_slots("post")
             try:
-                proc = DataProcessor()
-
-                def _to_csv_path(p):
-                    base, ext = os.path.splitext(p)
-                    return base + ".csv" if base else ""
-
-                # Process LEFT
-                if left_raw and os.path.isfile(left_raw):
-                    self.postLog.emit(f"Processing LEFT: {os.path.basename(left_raw)}")
+                # One stat per input, before any worker process is started
+                present = []
+                for label, raw, csv_path in sides:
+                    if os.path.isfile(raw):
+                        present.append((label, raw, csv_path))
+                    else:
+                        self.postLog.emit(f"{label} missing: {raw}")
+
+                # process_bin_file is pure-Python parsing; run LEFT and RIGHT in
+                # separate processes so they don't share one GIL. Spawned workers
+                # don't inherit the Qt/USB state of this process.
+                mp_context = multiprocessing.get_context("spawn")
+                worker_cancel = mp_context.Event()
+                with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=max(1, len(present)),
+                    mp_context=mp_context,
+                    initializer=init_cancel_event,
+                    initargs=(worker_cancel,),
+                ) as pool:
+                    jobs = {}
+                    for label, raw, csv_path in present:
+                        self.postLog.emit(f"Processing {label}: {os.path.basename(raw)}")
+                        jobs[pool.submit(process_bin_file_cancellable, raw, csv_path)] = (label, csv_path)
                     self.postProgress.emit(5)
-                    left_csv = _to_csv_path(left_raw)
-                    proc.process_bin_file(left_raw, left_csv)
-                    self.postLog.emit(f"LEFT → {os.path.basename(left_csv)}")
-                    self.postProgress.emit(50)
-                else:
-                    if left_raw:
-                        self.postLog.emit(f"LEFT missing: {left_raw}")
-                    self.postProgress.emit(50)
-
-                # Cancel check between files
-                if self._post_cancel.is_set():
-                    ok = False
-                    err = "Canceled"
-                    return
 
-                # Process RIGHT
-                if right_raw and os.path.isfile(right_raw):
-                    self.postLog.emit(f"Processing RIGHT: {os.path.basename(right_raw)}")
-                    self.postProgress.emit(55)
-                    right_csv = _to_csv_path(right_raw)
-                    proc.process_bin_file(right_raw, right_csv)
-                    self.postLog.emit(f"RIGHT → {os.path.basename(right_csv)}")
-                    self.postProgress.emit(95)
-                else:
-                    if right_raw:
-                        self.postLog.emit(f"RIGHT missing: {right_raw}")
-                    self.postProgress.emit(95)
+                    pending = set(jobs)
+                    while pending:
+                        # Both files parse at once, so cancel has to reach into the
+                        # running workers rather than wait for the next file
+                        if self._post_cancel.is_set():
+                            worker_cancel.set()
+                            pool.shutdown(wait=True, cancel_futures=True)
+                            for fut in pending:
+                                _, csv_path = jobs[fut]
+                                if os.path.isfile(csv_path):
+                                    os.remove(csv_path)
+                            ok = False
+                            err = "Canceled"
+                            left_csv = right_csv = ""
+                            self.postLog.emit("Post-process canceled.")
+                            return
+
+                        done_now, pending = concurrent.futures.wait(
+                            pending, timeout=0.2, return_when=concurrent.futures.FIRST_COMPLETED
+                        )
+                        for fut in done_now:
+                            label, csv_path = jobs[fut]
+                            fut.result()
+                            if label == "LEFT":
+                                left_csv = csv_path
+                            else:
+                                right_csv = csv_path
+                            self.postLog.emit(f"{label} → {os.path.basename(csv_path)}")
+                        self.postProgress.emit(5 + 90 * (len(jobs) - len(pending)) // len(jobs))
 
                 self.postProgress.emit(100)
 
@@ -2116,23 +2269,40 @@ class MOTIONConnector(QObject):
                 err = str(e)
                 self.postLog.emit(f"Post-process error: {err}")
             finally:
-                # clear thread handle before emitting
-                self._post_thread = None
+                self._release_worker_slots(slots)
+                # New CSVs may not move a coarse directory mtime; rescan next time
+                self._scan_cache_key = None
+                # clear busy flag before emitting
+                self._post_running = False
                 self.postFinished.emit(ok, err, left_csv or "", right_csv or "")
                 logger.info(f"Post-process finished: ok={ok}, err={err}, left_csv={left_csv}, right_csv={right_csv}")
 
-        self._post_thread = threading.Thread(target=_worker, daemon=True)
-        self._post_thread.start()
+        self._post_running = True
+        self._worker_pool.start(_worker)
         return True
 
     @pyqtSlot()
     def cancelPostProcess(self):
-        """Request cancel; takes effect between files."""
-        if self._post_thread is None:
+        """Request cancel; stops any file still being parsed."""
+        if not self._post_running:
             return
         self.postLog.emit("Cancel requested.")
         self._post_cancel.set()
 
+    def _acquire_worker_slots(self, job: str, blocking: bool = True) -> int:
+        """Take up to WORKER_BUDGETS[job] permits; returns how many were taken."""
+        taken = 0
+        # Never wait for more permits than exist (a 2-core machine has a budget of 1)
+        for _ in range(min(WORKER_BUDGETS[job], self._worker_budget)):
+            if not self._worker_slots.acquire(blocking=blocking):
+                break
+            taken += 1
+        return taken
+
+    def _release_worker_slots(self, count: int):
+        for _ in range(count):
+            self._worker_slots.release()
+
     # --- ERROR HANDLING METHODS / MISCELLANEOUS METHODS ---
     @pyqtSlot(str)
     def emitError(self, msg):
@@ -2148,14 +2318,17 @@ class MOTIONConnector(QObject):
         logger.info(f"Data received from {descriptor}: {message}")
         self.signalDataReceived.emit(descriptor, message)
     
-    def _write_stream_to_file(self, q: queue.Queue, stop_evt: threading.Event, filename: str, side: str):
+    def _write_stream_to_file(self, q: queue.SimpleQueue, filename: str, side: str):
         """
         Parse streaming binary data and write to CSV file.
         Uses the parser from parse_data_v2.py to convert binary packets to CSV rows.
         """
         try:
-            # Open CSV file for writing
-            with open(filename, "w", newline="") as f:
+            # Open CSV file for writing; a large buffer turns per-batch rows into few big writes
+            with open(filename, "w", newline="", buffering=CAPTURE_WRITE_BUFFER) as f:
+                if hasattr(os, "posix_fadvise"):
+                    # Written once front to back during the scan
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
                 csv_writer = csv.writer(f)
                 # Write CSV header
                 csv_writer.writerow(
@@ -2166,7 +2339,6 @@ class MOTIONConnector(QObject):
                 buffer_accumulator = bytearray()
                 
                 # Parse and write data using the helper function
-                proc = DataProcessor()
                 def _extra_cols():
                     with self._telemetry_lock:
                         return [int(self._tcm), int(self._tcl), f"{float(self._pdc):.3f}"]
@@ -2219,8 +2391,8 @@ class MOTIONConnector(QObject):
                         # Don't let plotting errors break the writer thread
                         return
 
-                rows_written = proc.parse_stream_to_csv(
-                    q, stop_evt, csv_writer, buffer_accumulator, extra_cols_fn=_extra_cols, on_row_fn=_on_row
+                rows_written = _DATA_PROCESSOR.parse_stream_to_csv(
+                    q, csv_writer, buffer_accumulator, extra_cols_fn=_extra_cols, on_row_fn=_on_row
                 )
                 
                 logger.info(f"Wrote {rows_written} rows to {filename}")
@@ -2229,12 +2401,57 @@ class MOTIONConnector(QObject):
             self.captureLog.emit(f"Writer error ({filename}): {e}")
             logger.error(f"Writer error ({filename}): {e}", exc_info=True)
        
+    def start_bootstrap(self, loop):
+        """Probe for connected devices on the loop's executor.
+
+        The probe is submitted immediately, so it runs while the caller carries on
+        (e.g. with engine.load). Returns a future to await before start_monitoring().
+        """
+        fut = loop.run_in_executor(None, self._probe_devices)
+        fut.add_done_callback(self._on_bootstrap_done)
+        return fut
+
+    def _probe_devices(self):
+        try:
+            return motion_interface.is_device_connected()
+        except Exception as e:
+            logger.error(f"Initial device probe failed: {e}")
+            return False, False, False
+
+    def _on_bootstrap_done(self, fut):
+        if fut.cancelled():
+            return
+        console_connected, left_sensor_connected, right_sensor_connected = fut.result()
+        self._leftSensorConnected = left_sensor_connected
+        self._rightSensorConnected = right_sensor_connected
+        self._consoleConnected = console_connected
+
+        # Emit synthetic connect events for devices already connected at startup
+        if self._leftSensorConnected:
+            self.on_connected("SENSOR_LEFT", "startup")
+        if self._rightSensorConnected:
+            self.on_connected("SENSOR_RIGHT", "startup")
+        if self._consoleConnected:
+            self.on_connected("CONSOLE", "startup")
+
+        # Start console status thread if console is already connected at startup
+        if self._consoleConnected and self._console_status_thread is None:
+            logger.info("[Connector] Console already connected at startup, starting status thread")
+            self._console_status_thread = ConsoleStatusThread(self)
+            self._console_status_thread.statusUpdate.connect(self.handleUpdateCapStatus)
+            self._console_status_thread.start()
+
+        self._notified_connection_flags = self._connection_flags()
+        self.connectionStatusChanged.emit()
+        self.update_state()
+
     def connect_signals(self):
         """Connect LIFUInterface signals to QML."""
         motion_interface.signal_connect.connect(self.on_connected)
         motion_interface.signal_disconnect.connect(self.on_disconnected)
         motion_interface.signal_data_received.connect(self.on_data_received)
         self.safetyTripDuringCaptureRequested.connect(self._on_safety_trip_during_capture)
+        self.captureFinished.connect(self._on_capture_finished)
 
     def _correction_worker(self):
         per_camera_state = {}
@@ -2279,18 +2496,32 @@ class _VizWorker(QObject):
     error = pyqtSignal(str)
     resultsReady = pyqtSignal(object)   # emits a dict with arrays/metadata
 
-    def __init__(self, left_csv, right_csv, t1, t2, plot_contrast=False):
+    def __init__(self, left_csv, right_csv, t1, t2, plot_contrast=False, worker_slots=None, pool=None,
+                 on_pool_broken=None):
         super().__init__()
         self.left_csv = left_csv
         self.right_csv = right_csv
         self.t1 = t1
         self.t2 = t2
         self.plot_contrast = plot_contrast
+        self.worker_slots = worker_slots
+        self.pool = pool
+        self.on_pool_broken = on_pool_broken
 
     @pyqtSlot()
     def run(self):
+        # Wait for a permit from the connector's worker budget (WORKER_BUDGETS["viz"] == 1)
+        if self.worker_slots is not None:
+            self.worker_slots.acquire()
         try:
-            from processing.visualize_bloodflow import VisualizeBloodflow
+            self._run()
+        finally:
+            if self.worker_slots is not None:
+                self.worker_slots.release()
+
+    def _run(self):
+        try:
+            from processing.visualize_bloodflow import compute_results
             # Convert empty strings to None for optional right_csv, but ensure left_csv is valid
             left_path = self.left_csv if self.left_csv else None
             right_path = self.right_csv if self.right_csv else None
@@ -2300,25 +2531,30 @@ class _VizWorker(QObject):
                 self.finished.emit()
                 return
                 
-            viz = VisualizeBloodflow(left_path, right_path, t1=self.t1, t2=self.t2)
-            viz.compute()       
-
             # Save results CSV based on left_csv or right_csv naming rule
             if self.left_csv:
-                new_file_name = re.sub(r"_left.*\.csv$", "_bfi_results.csv", self.left_csv)
+                new_file_name = _BFI_RESULTS_LEFT_RE.sub("_bfi_results.csv", self.left_csv)
+            else:
+                new_file_name = _BFI_RESULTS_RIGHT_RE.sub("_bfi_results.csv", self.right_csv)
+
+            args = (left_path, right_path, self.t1, self.t2, new_file_name)
+            if self.pool is not None:
+                payload = self.pool.submit(compute_results, *args).result()
             else:
-                new_file_name = re.sub(r"_right.*\.csv$", "_bfi_results.csv", self.right_csv)
-            viz.save_results_csv(new_file_name)
+                payload = compute_results(*args)
             logger.info(f"Results CSV saved to: {new_file_name}")
 
-            bfi, bvi, cam_inds, contrast, mean = viz.get_results()
-            payload = {"bfi": bfi, "bvi": bvi, "camera_inds": cam_inds, "contrast": contrast, "mean": mean,
-                       "nmodules": 2 if self.right_csv else 1,
-                       "sides": viz._sides,
-                       "freq": viz.frequency_hz, "t1": viz.t1, "t2": viz.t2,
-                       "plot_contrast": self.plot_contrast}
+            payload["nmodules"] = 2 if self.right_csv else 1
+            payload["plot_contrast"] = self.plot_contrast
             self.resultsReady.emit(payload)
             self.finished.emit()
+        except BrokenProcessPool as e:
+            # The compute process died (OOM, crash); a broken pool rejects every
+            # later submit, so hand it back to be replaced
+            if self.on_pool_broken is not None:
+                self.on_pool_broken(self.pool)
+            self.error.emit(f"Bloodflow compute process exited unexpectedly: {e}")
+            self.finished.emit()
         except Exception as e:
             self.error.emit(str(e))
 
@@ -2327,15 +2563,47 @@ class _ConfigureWorker(QThread):
     progress = pyqtSignal(int)
     log = pyqtSignal(str)
     finished = pyqtSignal(bool, str)
-    def __init__(self, interface, left_camera_mask:int, right_camera_mask:int):
+    def __init__(self, interface, left_camera_mask:int, right_camera_mask:int, power_sides=None):
         super().__init__()
         self.interface = interface
         self.left_camera_mask = left_camera_mask
         self.right_camera_mask = right_camera_mask
+        self.power_sides = power_sides  # [(side, mask, sensor)] to power up first, or None
         self._stop = False
 
     def stop(self): self._stop = True
 
+    def _power_cameras(self) -> str:
+        """Power on each side's masked cameras (and off the rest) before programming; returns an error or ""."""
+        logger.info("Powering on cameras before programming FPGAs…")
+        for side, mask, sensor in self.power_sides:
+            if mask == 0 or sensor is None:
+                continue
+            try:
+                power_status = sensor.get_camera_power_status()
+                if not power_status or len(power_status) != 8:
+                    logger.warning(f"{side}: could not get camera power status")
+                    continue
+                off_mask = sum(1 << i for i in range(8) if power_status[i] and not (mask & (1 << i)))
+                on_mask = mask & 0xFF
+                if off_mask:
+                    if sensor.disable_camera_power(off_mask):
+                        logger.warning(f"{side}: powered off cameras not in mask (0x{off_mask:02X})")
+                    time.sleep(0.05)
+                if on_mask:
+                    if sensor.enable_camera_power(on_mask):
+                        logger.warning(f"{side}: powered on cameras (mask 0x{on_mask:02X})")
+                    else:
+                        err = f"Failed to power on cameras on {side} (mask 0x{on_mask:02X})."
+                        logger.warning(err)
+                        return err
+                    time.sleep(0.5)
+            except Exception as e:
+                err = f"Error setting camera power for {side}: {e}"
+                logger.error(err)
+                return err
+        return ""
+
     def run(self):
         # Log masks for both modules
         logger.info(
@@ -2352,16 +2620,50 @@ class _ConfigureWorker(QThread):
             self.finished.emit(False, "Empty camera masks (left & right)")
             return
 
-        tasks = [("left", p) for p in left_positions] + [("right", p) for p in right_positions]
+        if self.power_sides:
+            err = self._power_cameras()
+            if err:
+                self.log.emit(err)
+                self.finished.emit(False, err)
+                return
+
+        sides = [(side, positions) for side, positions in (("left", left_positions), ("right", right_positions)) if positions]
+
+        # Each position has two steps: program_fpga and camera_configure_registers
+        self._total = (len(left_positions) + len(right_positions)) * 2
+        self._done = 0
+        self._done_lock = threading.Lock()
+        # The SDK makes no promise that run_on_sensors is safe from two threads at
+        # once, so the device calls take turns; only the waits between steps overlap
+        self._sdk_lock = threading.Lock()
+
+        # Positions on one module share its link and stay sequential; the left and
+        # right modules each get their own pass, interleaved step by step.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(sides)) as ex:
+            futures = [ex.submit(self._configure_side, side, positions) for side, positions in sides]
+            for fut in concurrent.futures.as_completed(futures):
+                err = fut.result()
+                if err:
+                    # Make the other module stop at its next step
+                    self._stop = True
+                    ex.shutdown(wait=True, cancel_futures=True)
+                    self.finished.emit(False, err)
+                    return
 
-        # Each task has two steps: program_fpga and camera_configure_registers
-        total = len(tasks) * 2
-        done = 0
+        logger.info("FPGAs programmed & registers configured")
+        self.finished.emit(True, "")
 
-        for side, pos in tasks:
+    def _step_done(self):
+        with self._done_lock:
+            self._done += 1
+            done = self._done
+        self.progress.emit(int(5 + (done / self._total) * 15))
+
+    def _configure_side(self, side: str, positions: List[int]) -> str:
+        """Program and configure each camera position on one module; returns an error or ""."""
+        for pos in positions:
             if self._stop:
-                self.finished.emit(False, "Canceled")
-                return
+                return "Canceled"
 
             cam_mask_single = 1 << pos
             pos1 = pos + 1  # human-friendly position
@@ -2370,12 +2672,13 @@ class _ConfigureWorker(QThread):
             logger.info(msg)
             self.log.emit(msg)
 
-            results = self.interface.run_on_sensors(
-                "program_fpga",
-                camera_position=cam_mask_single,
-                manual_process=False,
-                target=side,  # <-- Only this module
-            )
+            with self._sdk_lock:
+                results = self.interface.run_on_sensors(
+                    "program_fpga",
+                    camera_position=cam_mask_single,
+                    manual_process=False,
+                    target=side,  # <-- Only this module
+                )
 
             # Expect a dict like {'left': True} or {'right': True}
             if isinstance(results, dict):
@@ -2384,32 +2687,29 @@ class _ConfigureWorker(QThread):
                     err = f"Failed to program FPGA on {side} sensor (pos {pos1})."
                     logger.error(err)
                     self.log.emit(err)
-                    self.finished.emit(False, err)
-                    return
+                    return err
             elif results is not True:  # In case your interface returns a bare bool
                 err = f"program_fpga unexpected: {results!r}"
                 logger.error(err)
                 self.log.emit(err)
-                self.finished.emit(False, err)
-                return
+                return err
 
-            done += 1
-            self.progress.emit(int(5 + (done / total) * 15))
+            self._step_done()
 
             if self._stop:
-                self.finished.emit(False, "Canceled")
-                return
+                return "Canceled"
             time.sleep(0.1)
             # 2) Configure camera registers
             msg = f"Configuring {side} camera sensor registers at position {pos1}…"
             logger.info(msg)
             self.log.emit(msg)
 
-            cfg_results = self.interface.run_on_sensors(
-                "camera_configure_registers",
-                camera_position=cam_mask_single,
-                target=side,  # <-- Only this module
-            )
+            with self._sdk_lock:
+                cfg_results = self.interface.run_on_sensors(
+                    "camera_configure_registers",
+                    camera_position=cam_mask_single,
+                    target=side,  # <-- Only this module
+                )
 
             # Accept dict {'left': True} or a bare True
             cfg_ok = False
@@ -2422,14 +2722,11 @@ class _ConfigureWorker(QThread):
                 err = f"camera_configure_registers failed on {side} at position {pos1}: {cfg_results!r}"
                 logger.error(err)
                 self.log.emit(err)
-                self.finished.emit(False, err)
-                return
+                return err
 
-            done += 1
-            self.progress.emit(int(5 + (done / total) * 15))
+            self._step_done()
 
-        logger.info("FPGAs programmed & registers configured")
-        self.finished.emit(True, "")
+        return ""
 
 # --- Console Status Thread ---
 class ConsoleStatusThread(QThread):
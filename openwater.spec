@@ -16,7 +16,7 @@ hidden = []
 binaries = []
 
 # --- your existing resource folders (keep what you already had) ---
-for item in ("main.qml",):
+for item in ("main.qml", "splash.qml"):
     if os.path.exists(item):
         datas.append((item, "."))
 for folder in ("pages", "components", "assets", "models", "config", "models"):
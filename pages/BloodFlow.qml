@@ -16,8 +16,8 @@ Rectangle {
     radius: 20
     opacity: 0.95 // Slight transparency for the content area
 
-    property bool advancedSensors: (AppFlags && AppFlags.advancedSensors) ? AppFlags.advancedSensors : false
-    property bool realtimePlotEnabled: (AppFlags && AppFlags.realtimePlotEnabled) ? AppFlags.realtimePlotEnabled : false
+    property bool advancedSensors: AppFlags.advancedSensors
+    property bool realtimePlotEnabled: AppFlags.realtimePlotEnabled
     // property to store selected directory
     property string defaultDataDir: ""
 
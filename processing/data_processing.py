@@ -6,7 +6,6 @@ import argparse
 import numpy as np
 from typing import Dict, Tuple, List, Optional
 import queue
-import threading
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,6 +31,16 @@ MIN_PACKET_SIZE = PACKET_HEADER_SIZE + PACKET_FOOTER_SIZE + HISTO_BLOCK_SIZE
 
 SOF, SOH, EOH, EOF = 0xAA, 0xFF, 0xEE, 0xDD
 
+# Max chunks parse_stream_to_csv pulls off the queue per wake-up
+STREAM_DRAIN_BATCH = 64
+
+# Output buffer for process_bin_file; each row is ~1024 formatted numbers
+CSV_WRITE_BUFFER = 1 << 20
+
+def histo_packet_size(camera_mask: int) -> int:
+    """Bytes in one timestamped histogram packet carrying a block for each camera in camera_mask."""
+    return PACKET_HEADER_SIZE + TIMESTAMP_SIZE + bin(camera_mask & 0xFF).count("1") * HISTO_BLOCK_SIZE + PACKET_FOOTER_SIZE
+
 # ─── Struct formats ─────────────────────────────────────────
 _U32  = struct.Struct("<I")
 _U16  = struct.Struct("<H")
@@ -125,8 +134,13 @@ class DataProcessor:
 
     def process_bin_file(self, src_bin: str, dst_csv: str,
                          start_offset: int = 0,
-                         batch_rows: int = 4096) -> None:
-        """Convert binary → CSV."""
+                         batch_rows: int = 4096,
+                         cancel_event=None) -> bool:
+        """
+        Convert binary → CSV. Returns False if cancel_event (any object with
+        is_set(), e.g. a multiprocessing.Event) was set before the file was done;
+        it is checked once per batch of rows and the CSV is left partial.
+        """
         with open(src_bin, "rb") as f:
             data = memoryview(f.read())
 
@@ -136,7 +150,7 @@ class DataProcessor:
         bad_header_packets = []
         out_buf: List[List] = []
 
-        with open(dst_csv, "w", newline="") as fcsv:
+        with open(dst_csv, "w", newline="", buffering=CSV_WRITE_BUFFER) as fcsv:
             wr = csv.writer(fcsv)
             wr.writerow(
                 ["cam_id", "frame_id", "timestamp_s", *range(HISTO_SIZE_WORDS),
@@ -160,6 +174,8 @@ class DataProcessor:
                     if len(out_buf) >= batch_rows:
                         wr.writerows(out_buf)
                         out_buf.clear()
+                        if cancel_event is not None and cancel_event.is_set():
+                            return False
                 except Exception as exc:
                     error_count += 1
                     if exc.args and exc.args[0] == "CRC mismatch":
@@ -187,63 +203,89 @@ class DataProcessor:
 
         total_packets = packet_ok + packet_fail + crc_failure + other_fail + bad_header_fail
         print(f"Parsed {total_packets} packets, {packet_ok} OK")
+        return True
 
-    def parse_stream_to_csv(self, q: queue.Queue, stop_evt: threading.Event, csv_writer, buffer_accumulator: bytearray, extra_cols_fn=None, on_row_fn=None):
+    def parse_stream_to_csv(self, q: queue.SimpleQueue, csv_writer, buffer_accumulator: bytearray, extra_cols_fn=None, on_row_fn=None):
         """
         Parse streaming binary data and write to CSV.
-        This function is called to process data from the queue.
+        This function is called to process data from the queue until it yields None.
         Returns the number of rows written.
         """
         rows_written = 0
-        
-        while not stop_evt.is_set() or not q.empty():
-            try:
-                queue_size_before = q.qsize()
-                data = q.get(timeout=0.100)
-                if data:
-                    buffer_accumulator.extend(data)
-                q.task_done()
-            except queue.Empty:
-                continue
+        end_of_stream = False
+
+        while not end_of_stream:
+            # Block until data (or the None end marker) arrives, then take whatever
+            # else is already queued so one parse pass covers the batch
+            batch = [q.get()]
+            while len(batch) < STREAM_DRAIN_BATCH:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            for data in batch:
+                if data is None:
+                    end_of_stream = True
+                    break
+                buffer_accumulator.extend(data)
             
-            # Try to parse packets from the accumulated buffer
+            # Try to parse packets from the accumulated buffer. Parse through one view of the
+            # accumulator: slicing the bytearray itself copied the whole tail for every packet.
             offset = 0
-            while offset + MIN_PACKET_SIZE <= len(buffer_accumulator):
-                try:
-                    pkt_view = memoryview(buffer_accumulator[offset:])
-                    hists, ids, temps, timestamp_sec, consumed = self.parse_histogram_packet(pkt_view)
-                    offset += consumed
-                    # Write CSV rows for each camera in this packet
-                    ts_val = timestamp_sec if timestamp_sec is not None else 0.0
-                    for cam_id, hist in hists.items():
-                        row_sum = int(hist.sum(dtype=np.uint64))
-                        extra_cols = extra_cols_fn() if extra_cols_fn else []
-                        row = [cam_id, ids[cam_id], ts_val, *hist.tolist(), temps[cam_id], row_sum, *extra_cols]
-                        csv_writer.writerow(row)
-                        rows_written += 1
-                        if on_row_fn:
-                            on_row_fn(cam_id, ids[cam_id], ts_val, hist, row_sum, temps[cam_id])
-                        
-                except ValueError as e:
-                    # Try to resync on error
-                    pat = b"\xAA\x00\x41"
-                    old_off = offset
-                    offset += 1
-                    nxt = buffer_accumulator.find(pat, offset)
-                    if nxt != -1:
-                        offset = nxt
-                        logger.warning(f"Parser error, resyncing: {e}")
-                        continue
-                    else:
-                        # Can't find next packet, wait for more data
-                        break
+            rows = []
+            with memoryview(buffer_accumulator) as acc_view:
+                while offset + MIN_PACKET_SIZE <= len(buffer_accumulator):
+                    try:
+                        hists, ids, temps, timestamp_sec, consumed = self.parse_histogram_packet(acc_view[offset:])
+                        offset += consumed
+                        # Write CSV rows for each camera in this packet
+                        ts_val = timestamp_sec if timestamp_sec is not None else 0.0
+                        for cam_id, hist in hists.items():
+                            row_sum = int(hist.sum(dtype=np.uint64))
+                            extra_cols = extra_cols_fn() if extra_cols_fn else []
+                            row = [cam_id, ids[cam_id], ts_val, *hist.tolist(), temps[cam_id], row_sum, *extra_cols]
+                            rows.append(row)
+                            if on_row_fn:
+                                on_row_fn(cam_id, ids[cam_id], ts_val, hist, row_sum, temps[cam_id])
+                            
+                    except ValueError as e:
+                        # Try to resync on error
+                        pat = b"\xAA\x00\x41"
+                        old_off = offset
+                        offset += 1
+                        nxt = buffer_accumulator.find(pat, offset)
+                        if nxt != -1:
+                            offset = nxt
+                            logger.warning(f"Parser error, resyncing: {e}")
+                            continue
+                        else:
+                            # Can't find next packet, wait for more data
+                            break
             
+            # One writerows() per batch instead of a writerow() per camera frame
+            if rows:
+                csv_writer.writerows(rows)
+                rows_written += len(rows)
+
             # Remove processed data from buffer
             if offset > 0:
                 del buffer_accumulator[:offset]
         
         return rows_written
 
+
+# Cancel flag for process_bin_file_cancellable() in a worker process; see init_cancel_event()
+_worker_cancel_event = None
+
+def init_cancel_event(event) -> None:
+    """ProcessPoolExecutor initializer: hand the parent's cancel Event to this worker."""
+    global _worker_cancel_event
+    _worker_cancel_event = event
+
+def process_bin_file_cancellable(src_bin: str, dst_csv: str) -> bool:
+    """process_bin_file() for a pool worker; stops early once the initializer's Event is set."""
+    return DataProcessor().process_bin_file(src_bin, dst_csv, cancel_event=_worker_cancel_event)
+
     
 def main():
     parser = argparse.ArgumentParser(description="Process histogram .bin to .csv")
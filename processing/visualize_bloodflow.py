@@ -16,11 +16,15 @@ Usages:
 from __future__ import annotations
 import argparse
 from dataclasses import dataclass, field
-from typing import Optional, Tuple, List
+from typing import TYPE_CHECKING, Optional, Tuple, List
 import os
 import numpy as np  
 import pandas as pd
-import matplotlib.pyplot as plt
+
+if TYPE_CHECKING:
+    # pyplot is imported where it's used: the app loads this module at startup and
+    # compute_results() runs in worker processes, neither of which plot
+    import matplotlib.pyplot as plt
 
 
 @dataclass
@@ -256,6 +260,8 @@ class VisualizeBloodflow:
             nrows = len(camera_inds)
             ncols = 1
 
+        import matplotlib.pyplot as plt
+
         # Create grid with appropriate number of columns
         fig, ax = plt.subplots(nrows=nrows, ncols=ncols, figsize=(6 * ncols, 8), squeeze=False)
 
@@ -341,6 +347,7 @@ class VisualizeBloodflow:
 
     def show(self) -> None:
         """Show the current matplotlib figure."""
+        import matplotlib.pyplot as plt
         plt.show()
 
     def save_results_csv(self, path: str) -> None:
@@ -423,6 +430,23 @@ class VisualizeBloodflow:
 # --------------------------
 # CLI
 # --------------------------
+def compute_results(left_csv: Optional[str], right_csv: Optional[str] = None,
+                    t1: float = 0.0, t2: float = 120.0, results_csv: Optional[str] = None) -> dict:
+    """
+    Run compute() and return the results as plain data, optionally saving the results CSV.
+    Module-level (and free of Qt) so the app can run it in a worker process.
+    """
+    viz = VisualizeBloodflow(left_csv, right_csv, t1=t1, t2=t2)
+    viz.compute()
+    if results_csv:
+        viz.save_results_csv(results_csv)
+
+    bfi, bvi, camera_inds, contrast, mean = viz.get_results()
+    return {"bfi": bfi, "bvi": bvi, "camera_inds": camera_inds, "contrast": contrast, "mean": mean,
+            "sides": viz._sides,
+            "freq": viz.frequency_hz, "t1": viz.t1, "t2": viz.t2}
+
+
 def _build_argparser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Compute and visualize BFI/BVI from histogram CSVs.")
     p.add_argument("--left", help="Left module CSV file (at least one of --left or --right required)")
@@ -0,0 +1,45 @@
+import QtQuick 6.0
+import QtQuick.Window 6.0
+
+// Shown while main.py imports the device stack and loads main.qml.
+// Keep this file free of OpenMotion imports: the singletons are not registered yet.
+Window {
+    id: splash
+    visible: true
+    width: 420
+    height: 200
+    flags: Qt.SplashScreen | Qt.FramelessWindowHint
+    color: "transparent"
+
+    Rectangle {
+        anchors.fill: parent
+        color: "#1C1C1E"
+        radius: 20
+
+        Column {
+            anchors.centerIn: parent
+            spacing: 16
+
+            Image {
+                anchors.horizontalCenter: parent.horizontalCenter
+                source: "assets/images/OpenwaterLogo.png"
+                height: 48
+                fillMode: Image.PreserveAspectFit
+            }
+
+            Text {
+                anchors.horizontalCenter: parent.horizontalCenter
+                text: "Open-MOTION BloodFlow"
+                color: "#FFFFFF"
+                font.pixelSize: 18
+            }
+
+            Text {
+                anchors.horizontalCenter: parent.horizontalCenter
+                text: "Loading..."
+                color: "#BDC3C7"
+                font.pixelSize: 14
+            }
+        }
+    }
+}
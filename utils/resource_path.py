@@ -1,5 +1,6 @@
 # utils/resource_path.py
 from pathlib import Path
+import functools
 import sys
 import os
 
@@ -20,6 +21,9 @@ def app_base_dir() -> Path:
         base = Path(__file__).resolve().parent.parent  # adjust if you prefer a different root
     return base
 
+# The bundle location cannot change while the process runs
+_BASE_DIR = app_base_dir()
+
 def resource_path(*relative_parts: str) -> Path:
     """
     Build a resource path with fallbacks:
@@ -27,25 +31,31 @@ def resource_path(*relative_parts: str) -> Path:
     - next to exe (one-folder)
     - inside _MEIPASS (one-file)
     - inside _internal (newer PyInstaller layouts)
+
+    Results are memoized per normalized path, so "config/x.json" and
+    ("config", "x.json") share one entry and each resource is probed once per process.
     """
+    return _resolve_resource(Path(*relative_parts).parts)
+
+@functools.lru_cache(maxsize=None)
+def _resolve_resource(parts: tuple) -> Path:
     # If asking for config/* and env override is present, honor it
-    parts = Path(*relative_parts)
-    if len(parts.parts) >= 1 and parts.parts[0] == "config":
+    if len(parts) >= 1 and parts[0] == "config":
         env_dir = os.environ.get("OPENWATER_CONFIG_DIR")
         if env_dir:
-            p = Path(env_dir).joinpath(*parts.parts[1:])
+            p = Path(env_dir).joinpath(*parts[1:])
             if p.exists():
                 return p
 
-    base = app_base_dir()
+    base = _BASE_DIR
 
     # 1) Try directly under base (dev & one-folder)
-    p = base.joinpath(*relative_parts)
+    p = base.joinpath(*parts)
     if p.exists():
         return p
 
     # 2) Try under _internal (PyInstaller may place datas there)
-    p2 = base.joinpath("_internal", *relative_parts)
+    p2 = base.joinpath("_internal", *parts)
     if p2.exists():
         return p2
 
@@ -1,60 +1,82 @@
 # utils/single_instance.py
 """
-Single-instance application utilities (Windows only).
+Single-instance application utilities.
 
 Provides functionality to ensure only one instance of the application
-can run at a time on Windows, preventing multiple instances from being launched.
-On non-Windows platforms, this module allows multiple instances.
+can run at a time, preventing multiple instances from being launched.
+On Windows a named mutex is used; on other platforms an advisory
+``flock`` on a file in ``$XDG_RUNTIME_DIR`` (or the temp dir). Both are
+a single kernel call with no socket setup.
 """
+import os
 import sys
 import atexit
 import logging
 
 # Module-level state for lock management
 _mutex = None
+_lock_fd = None
 
 # Get logger (may not be configured when this module is imported)
 logger = logging.getLogger("openmotion.bloodflow-app")
 
+ERROR_ALREADY_EXISTS = 183
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    # Resolve the kernel32 entry points once, with real prototypes so HANDLEs
+    # aren't truncated to int; use_last_error keeps GetLastError() from being
+    # clobbered by ctypes between the call and the check.
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _CreateMutexW = _kernel32.CreateMutexW
+    _CreateMutexW.argtypes = (wintypes.LPVOID, wintypes.BOOL, wintypes.LPCWSTR)
+    _CreateMutexW.restype = wintypes.HANDLE
+    _CloseHandle = _kernel32.CloseHandle
+    _CloseHandle.argtypes = (wintypes.HANDLE,)
+    _CloseHandle.restype = wintypes.BOOL
+
 
 def check_single_instance(app_name: str = "OpenWaterBloodflowApp") -> bool:
     """
-    Check if another instance is already running (Windows only).
+    Check if another instance is already running.
     
     On Windows, uses a named mutex to detect if another instance is running.
-    On non-Windows platforms, always returns True (allows multiple instances).
+    On other platforms, takes a non-blocking exclusive ``flock`` on
+    ``<runtime dir>/<app_name>.lock``; the kernel drops it when the process exits.
     
     Args:
-        app_name: Name identifier for the application (used for mutex naming)
+        app_name: Name identifier for the application (used for mutex/lock naming)
         
     Returns:
-        True if this is the first instance (or on non-Windows), 
-        False if another instance is already running (Windows only).
+        True if this is the first instance,
+        False if another instance is already running.
     """
     global _mutex
     
-    # Only enforce single-instance on Windows
     if sys.platform != "win32":
-        return True
+        return _check_single_instance_posix(app_name)
     
     # Use named mutex on Windows
     try:
-        import ctypes
-        
         # Create a named mutex
         mutex_name = f"Global\\{app_name}"
-        _mutex = ctypes.windll.kernel32.CreateMutexW(
+        _mutex = _CreateMutexW(
             None,  # Default security attributes
             True,  # Initial owner
             mutex_name
         )
         
         # Check if mutex already exists (GetLastError returns ERROR_ALREADY_EXISTS)
-        last_error = ctypes.windll.kernel32.GetLastError()
+        last_error = ctypes.get_last_error()
+        
+        if not _mutex:
+            raise OSError(f"CreateMutexW failed (error {last_error})")
         
-        if last_error == 183:  # ERROR_ALREADY_EXISTS
+        if last_error == ERROR_ALREADY_EXISTS:
             # Another instance is running
-            ctypes.windll.kernel32.CloseHandle(_mutex)
+            _CloseHandle(_mutex)
             _mutex = None
             return False
         
@@ -63,23 +85,56 @@ def check_single_instance(app_name: str = "OpenWaterBloodflowApp") -> bool:
         return True
         
     except Exception as e:
-        # Logging may not be configured yet, so use print as fallback
+        # Before logging is configured this still reaches stderr via logging.lastResort
+        logger.error("Failed to create mutex: %s", e)
+        # On error, allow the instance to proceed (fail open)
+        return True
+
+
+def _check_single_instance_posix(app_name: str) -> bool:
+    """Take an exclusive, non-blocking flock on a per-user lock file."""
+    global _lock_fd
+    
+    try:
+        import fcntl
+        import tempfile
+        
+        lock_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+        lock_path = os.path.join(lock_dir, f"{app_name}.lock")
+        # Raw fd: nothing is ever written, so skip the buffered/text file object.
+        # No O_EXCL: a file left behind by a crash is fine, the flock is what's atomic.
+        fd = os.open(lock_path, os.O_CREAT | os.O_WRONLY, 0o600)
         try:
-            logger.error(f"Failed to create mutex: {e}")
-        except:
-            print(f"Error: Failed to create mutex: {e}")
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Another instance holds the lock
+            os.close(fd)
+            return False
+        
+        _lock_fd = fd
+        atexit.register(cleanup_single_instance)
+        return True
+        
+    except Exception as e:
+        logger.error("Failed to acquire instance lock: %s", e)
         # On error, allow the instance to proceed (fail open)
         return True
 
 
 def cleanup_single_instance():
-    """Clean up the single-instance mutex (Windows only)."""
-    global _mutex
+    """Release the single-instance mutex / lock file."""
+    global _mutex, _lock_fd
+    
+    if _lock_fd is not None:
+        try:
+            os.close(_lock_fd)
+        except Exception:
+            pass
+        _lock_fd = None
     
     if _mutex:
         try:
-            import ctypes
-            ctypes.windll.kernel32.CloseHandle(_mutex)
+            _CloseHandle(_mutex)
             _mutex = None
         except Exception:
             pass